@@ -14,14 +14,21 @@ The component is used for development and testing of the image generation system
 from nicegui import ui, events
 from app.core.image_scene_parser import ImageSceneParser
 from app.core.image_generator import ImageGenerator
+from app.models.images import ImageEntry
 from app.services.qdrant_image_store import QdrantImageStore
 from app.services.embedder import get_embedder
-from app.services.store_images import StoreImages
+from app.services.store_images import get_image_store
+from app.services.embed_cache import get_embed_cache
+from app.services.http_client import fetch_bytes
+from app.utils.text import shorten
 import asyncio
-import uuid
+from async_timeout import timeout
+from uuid import uuid4
 import time
-import requests
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Lightbox:
     """
@@ -98,12 +105,13 @@ class Lightbox:
                         self.status = ui.label("").classes('text-white ml-4')
         
         # Internal state management
-        self.image_list = []         # List of image URLs
-        self.prompt_list = []        # List of original prompts
-        self.parsed_prompt_list = [] # List of parsed prompts
-        self.id_list = []            # List of unique image IDs
+        self.entries = []            # One ImageEntry per added image, in display order
         self.current_index = 0       # Current image index being viewed
         self.rating = 0              # Current image rating
+        self._index_by_url = {}      # Maps image URL to its first index in entries
+        self._qdrant = QdrantImageStore()     # Shared Qdrant store, reused across rating clicks
+        self._embedder = get_embedder()       # Shared embedder, reused across rating clicks
+        self._image_store = get_image_store() # Shared MinIO storage, reused across rating clicks
 
     def add_image(self, image_url: str, original_prompt: str = "", parsed_prompt: str = "", image_id: str = None) -> None:
         """
@@ -115,10 +123,8 @@ class Lightbox:
             parsed_prompt: Processed prompt used for generation
             image_id: Unique ID for the image (generates UUID if not provided)
         """
-        self.image_list.append(image_url)
-        self.prompt_list.append(original_prompt)
-        self.parsed_prompt_list.append(parsed_prompt)
-        self.id_list.append(image_id or str(uuid.uuid4()))
+        self._index_by_url.setdefault(image_url, len(self.entries))
+        self.entries.append(ImageEntry(image_url, image_id or uuid4().hex, original_prompt, parsed_prompt))
 
     def show(self, image_url: str) -> None:
         """
@@ -127,12 +133,12 @@ class Lightbox:
         Args:
             image_url: URL of the image to display
         """
-        try:
-            # Find the index of the image in our collection
-            idx = self.image_list.index(image_url)
-            self._open(self.image_list[idx])
-        except ValueError:
-            print(f"Image URL {image_url} not found in lightbox")
+        # Find the index of the image in our collection
+        idx = self._index_by_url.get(image_url)
+        if idx is None:
+            logger.debug("Image URL %s not found in lightbox", image_url)
+            return
+        self._open(image_url, idx)
 
     def _handle_key(self, event_args: events.KeyEventArguments) -> None:
         """
@@ -166,30 +172,29 @@ class Lightbox:
         new_idx = current_idx + direction
         
         # Ensure index is within bounds
-        if 0 <= new_idx < len(self.image_list):
-            self._open(self.image_list[new_idx])
+        if 0 <= new_idx < len(self.entries):
+            self._open(self.entries[new_idx].url, new_idx)
 
-    def _open(self, url: str) -> None:
+    def _open(self, url: str, index: int = None) -> None:
         """
         Open and display an image in the lightbox.
         
         Args:
             url: URL of the image to display
+            index: Position of the image in the collection (looked up by URL if not provided)
         """
         # Set the image source
         self.large_image.set_source(url)
         
         # Update current index and counter
-        current_idx = self.image_list.index(url)
+        current_idx = self._index_by_url[url] if index is None else index
         self.current_index = current_idx
-        self.counter.text = f'{current_idx + 1} / {len(self.image_list)}'
+        self.counter.text = f'{current_idx + 1} / {len(self.entries)}'
         
         # Update prompt information
-        if current_idx < len(self.prompt_list):
-            self.original_prompt.content = f"**Original prompt:** {self.prompt_list[current_idx]}"
-        
-        if current_idx < len(self.parsed_prompt_list):
-            self.parsed_prompt.content = f"**Parsed prompt:** {self.parsed_prompt_list[current_idx]}"
+        entry = self.entries[current_idx]
+        self.original_prompt.content = f"**Original prompt:** {entry.original_prompt}"
+        self.parsed_prompt.content = f"**Parsed prompt:** {entry.parsed_prompt}"
         
         # Open the dialog
         self.dialog.open()
@@ -221,13 +226,14 @@ class Lightbox:
         try:
             # Get current image information
             current_idx = self.current_index
-            if current_idx < 0 or current_idx >= len(self.id_list):
+            if current_idx < 0 or current_idx >= len(self.entries):
                 return
                 
-            image_id = self.id_list[current_idx]
-            image_url = self.image_list[current_idx]
-            original_prompt = self.prompt_list[current_idx]
-            parsed_prompt = self.parsed_prompt_list[current_idx]
+            entry = self.entries[current_idx]
+            image_id = entry.id
+            image_url = entry.url
+            original_prompt = entry.original_prompt
+            parsed_prompt = entry.parsed_prompt
             
             # Determine the appropriate rating message for user feedback
             if rating_value > 0:
@@ -239,10 +245,10 @@ class Lightbox:
                 
             self.status.text = f"{rating_message} rating image..."
             
-            # Get service instances
-            embedder = get_embedder()
-            qdrant = QdrantImageStore()
-            image_store = StoreImages()
+            # Reuse the service instances bound at construction
+            embedder = self._embedder
+            qdrant = self._qdrant
+            image_store = self._image_store
             
             # First check if image already exists in Qdrant
             update_success = False
@@ -257,7 +263,7 @@ class Lightbox:
             except Exception as check_e:
                 # Only print if it's not a 404 error (expected when image doesn't exist yet)
                 if "404" not in str(check_e) and "Not found" not in str(check_e):
-                    print(f"Unexpected error checking image in Qdrant: {str(check_e)}")
+                    logger.warning("Unexpected error checking image in Qdrant: %s", check_e)
             
             # If update was successful, we're done
             if update_success:
@@ -265,9 +271,7 @@ class Lightbox:
                 
             # If image doesn't exist in Qdrant, download it first
             try:
-                response = requests.get(image_url)
-                response.raise_for_status()
-                image_data = response.content
+                image_data = await fetch_bytes(image_url)
             except Exception as e:
                 self.status.text = f"Failed to download image: {str(e)}"
                 return
@@ -281,35 +285,41 @@ class Lightbox:
                 self.status.text = f"Failed to save image: {str(e)}"
                 return
             
-            # Upload to MinIO storage
-            try:
-                minio_url = image_store.upload_image(temp_file, f"{image_id}.jpg")
-                self.status.text = f"Image uploaded to MinIO..."
-            except Exception as e:
-                self.status.text = f"Failed to upload to MinIO: {str(e)}"
-                # Clean up temp file on error
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-                return
+            loop = asyncio.get_event_loop()
+            embed_cache = get_embed_cache()
             
-            # Generate CLIP embedding for similarity search
-            image_vector = embedder.embed_image_from_file(temp_file)
-            if image_vector is None:
-                self.status.text = "Failed to embed image"
-                # Clean up temp file on error
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-                return
+            async def embed():
+                # Reuse the embedding from an earlier attempt if we have one
+                cached = await embed_cache.get(image_id)
+                if cached is not None:
+                    return cached[0]
+                vector = await loop.run_in_executor(None, embedder.embed_image_from_file, temp_file)
+                if vector is not None:
+                    embed_cache.put(image_id, vector)
+                return vector
+            
+            # Upload to MinIO and generate the CLIP embedding side by side; they only
+            # share the temp file, and both block, so they run off the event loop
+            minio_url, image_vector = await asyncio.gather(
+                loop.run_in_executor(None, image_store.upload_image, temp_file, f"{image_id}.jpg"),
+                embed(),
+                return_exceptions=True
+            )
             
             # Clean up temporary file
             try:
                 os.remove(temp_file)
             except:
                 pass
+            
+            if isinstance(minio_url, Exception):
+                self.status.text = f"Failed to upload to MinIO: {str(minio_url)}"
+                return
+            if isinstance(image_vector, Exception):
+                raise image_vector
+            if image_vector is None:
+                self.status.text = "Failed to embed image"
+                return
                 
             # Prepare payload with all context for Qdrant
             payload = {
@@ -337,9 +347,7 @@ class Lightbox:
                 
         except Exception as e:
             # Log detailed error information
-            import traceback
-            print(f"Error storing rated image: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error storing rated image")
             self.status.text = f"Error: {str(e)}"
 
 def test_image_generator_parser():
@@ -371,111 +379,133 @@ def test_image_generator_parser():
         
         async def generate_images(scenes):
             """
-            Generate images for each parsed scene in parallel.
+            Generate an image for each parsed scene as soon as the parser produces it.
             
             Args:
-                scenes: List of scene objects from the parser
+                scenes: Async iterator of scene objects from the parser
+                
+            Returns:
+                int: Number of scenes received
+            
+            Generation of the first scenes overlaps with the parser still
+            writing the later ones.
             """
-            with results_container:
-                # Display parsed scenes section
-                ui.label('Parsed Scenes').classes('text-h6 q-mt-md')
-                for scene in scenes:
-                    with ui.card().classes('q-mb-sm q-pa-sm bg-dark'):
+            async def generate_scene(task):
+                # Isolate failures per scene so one bad image doesn't abort the others
+                try:
+                    return task, await image_generator.generate_one(task['scene'])
+                except Exception as e:
+                    logger.error("Error generating image: %s", e)
+                    return task, None
+            
+            scene_list = None  # Parsed scene column, created with the first scene
+            generations = []
+            
+            try:
+                # Parsing gets a bounded time; generations already started keep running
+                async with timeout(30):
+                    async for scene in scenes:
+                        if scene_list is None:
+                            # Replace the status card with the result sections
+                            results_container.clear()
+                            with results_container:
+                                ui.label('Parsed Scenes').classes('text-h6 q-mt-md')
+                                scene_list = ui.column().classes('w-full')
+                                ui.separator()
+                                ui.label('Generated Images').classes('text-h6 q-mt-md')
+                                image_row = ui.row().classes('q-gutter-md flex-wrap')
+                        
+                        # Work out the scene text and its card caption before building any UI
                         original_text = scene.get('original_text', '') if isinstance(scene, dict) else scene
-                        ui.label(original_text).classes('text-body2')
-                
-                ui.separator()
-                
-                # Start image generation section
-                ui.label('Generated Images').classes('text-h6 q-mt-md')
-                with ui.row().classes('q-gutter-md flex-wrap'):
-                    tasks = []
-                    containers = []
-                    
-                    # Create UI containers for each scene
-                    for scene in scenes:
+                        with scene_list:
+                            with ui.card().classes('q-mb-sm q-pa-sm bg-dark'):
+                                ui.label(original_text).classes('text-body2')
+                        
                         try:
-                            scene_prompt = scene.get('prompt', scene) if isinstance(scene, dict) else scene
-                            
-                            # Build card for each image
-                            with ui.card().classes('q-pa-xs'):
-                                # Loading spinner (shown during generation)
-                                loading = ui.spinner('default', size='xl').props('color=primary')
-                                
-                                # Image container (clickable for lightbox)
-                                container = ui.button().props('flat dense').classes('w-[300px] h-[300px] overflow-hidden')
-                                with container:
-                                    img = ui.image().props('fit=cover').classes('w-full h-full')
-                                    img.visible = False
-                                
-                                # Description and frame info
-                                with ui.row().classes('items-center justify-between q-mt-xs'):
-                                    # Truncate long descriptions
-                                    original_text = scene.get('original_text', '') if isinstance(scene, dict) else scene
-                                    desc = original_text[:30] + "..." if len(original_text) > 30 else original_text
-                                    ui.label(desc).classes('text-caption text-grey-5 ellipsis')
+                            # Build card for the image
+                            with image_row:
+                                with ui.card().classes('q-pa-xs'):
+                                    # Loading spinner (shown during generation)
+                                    loading = ui.spinner('default', size='xl').props('color=primary')
+                                    
+                                    # Image container (clickable for lightbox)
+                                    container = ui.button().props('flat dense').classes('w-[300px] h-[300px] overflow-hidden')
+                                    with container:
+                                        img = ui.image().props('fit=cover').classes('w-full h-full')
+                                        img.visible = False
                                     
-                                    # Show frame number if available
-                                    frame = scene.get('frame')
-                                    if frame:
-                                        ui.label(f"[Frame {frame}]").classes('text-caption text-grey-5')
-                                
-                                # Track task and container for later updates
-                                tasks.append({
-                                    'scene': scene,
-                                    'loading': loading,
-                                    'img': img,
-                                    'button': container
-                                })
-                                containers.append(container)
+                                    # Description and frame info
+                                    with ui.row().classes('items-center justify-between q-mt-xs'):
+                                        # Truncated description
+                                        ui.label(shorten(original_text)).classes('text-caption text-grey-5 ellipsis')
+                                        
+                                        # Show frame number if available
+                                        frame = scene.get('frame')
+                                        if frame:
+                                            ui.label(f"[Frame {frame}]").classes('text-caption text-grey-5')
+                            
+                            # Start generating right away, without waiting for the remaining scenes
+                            task = {
+                                'scene': scene,
+                                'loading': loading,
+                                'img': img,
+                                'button': container
+                            }
+                            generations.append(asyncio.create_task(generate_scene(task)))
                         except Exception as e:
-                            print(f"Error setting up image generation for scene: {scene}")
-                            print(f"Error details: {str(e)}")
+                            logger.error("Error setting up image generation for scene %s: %s", scene, e)
                             ui.notify(f"Error setting up image generation: {str(e)}", type='negative')
-                    
-                    try:
-                        # Generate all images in parallel
-                        print(f"Generating {len(scenes)} images in parallel...")
-                        image_urls = await image_generator.generate(scenes)
+            except asyncio.TimeoutError:
+                logger.warning("Timeout while waiting for scene parsing")
+                if not generations:
+                    raise
+                ui.notify("Scene parsing timed out, showing the scenes parsed so far", type='warning')
+            
+            try:
+                logger.debug("Generating %d images in parallel", len(generations))
+                
+                # Update each card in completion order
+                for next_done in asyncio.as_completed(generations):
+                    task, image_url = await next_done
+                    if image_url:
+                        # Generation successful
+                        logger.debug("Successfully generated image: %s", image_url)
                         
-                        # Update UI after generation completes
-                        for task, image_url in zip(tasks, image_urls):
-                            if image_url:
-                                # Generation successful
-                                print(f"Successfully generated image: {image_url}")
-                                
-                                # Update UI elements
-                                task['loading'].visible = False
-                                task['img'].set_source(image_url['url'])
-                                task['img'].visible = True
-                                
-                                # Extract prompt information
-                                scene_data = task['scene']
-                                original_prompt = scene_data.get('original_text', '') if isinstance(scene_data, dict) else str(scene_data)
-                                parsed_prompt = scene_data.get('prompt', scene_data) if isinstance(scene_data, dict) else str(scene_data)
-                                
-                                # Add to lightbox for preview/rating
-                                lightbox.add_image(
-                                    image_url=image_url['url'],
-                                    original_prompt=original_prompt,
-                                    parsed_prompt=parsed_prompt
-                                )
-                                
-                                # Setup lightbox click handler
-                                task['button'].on('click', lambda url=image_url['url']: lightbox.show(url))
-                                
-                                ui.notify("Image generated successfully", type='positive')
-                            else:
-                                # Generation failed
-                                task['loading'].visible = False
-                                ui.label('Generation failed').classes('text-caption text-negative')
-                    
-                    except Exception as e:
-                        # Handle errors in parallel generation process
-                        print(f"Error in parallel generation: {str(e)}")
-                        ui.notify(f"Error generating images: {str(e)}", type='negative')
+                        # Update UI elements
+                        task['loading'].visible = False
+                        task['img'].set_source(image_url['url'])
+                        task['img'].visible = True
+                        
+                        # Extract prompt information
+                        scene_data = task['scene']
+                        original_prompt = scene_data.get('original_text', '') if isinstance(scene_data, dict) else str(scene_data)
+                        parsed_prompt = scene_data.get('prompt', scene_data) if isinstance(scene_data, dict) else str(scene_data)
+                        
+                        # Add to lightbox for preview/rating
+                        lightbox.add_image(
+                            image_url=image_url['url'],
+                            original_prompt=original_prompt,
+                            parsed_prompt=parsed_prompt
+                        )
+                        
+                        # Setup lightbox click handler
+                        task['button'].on('click', lambda url=image_url['url']: lightbox.show(url))
+                        
+                        ui.notify("Image generated successfully", type='positive')
+                    else:
+                        # Generation failed, mark this card only
+                        task['loading'].visible = False
+                        with task['button']:
+                            ui.label('Generation failed').classes('text-caption text-negative')
+            
+            except Exception as e:
+                # Handle errors in parallel generation process
+                logger.error("Error in parallel generation: %s", e)
+                ui.notify(f"Error generating images: {str(e)}", type='negative')
+            
+            return len(generations)
         
-        async def run_test(e):
+        async def execute_test():
             """
             Run the test with the current input text.
             
@@ -483,9 +513,6 @@ def test_image_generator_parser():
             1. Parses the input text for visual scenes
             2. Generates images for each scene
             3. Displays the results
-            
-            Args:
-                e: Event object from button click
             """
             try:
                 # Clear previous results
@@ -504,61 +531,28 @@ def test_image_generator_parser():
                     "raw_text": test_input.value
                 }
                 
+                # Update status to show parsing phase
+                status_card.clear()
+                with status_card:
+                    with ui.row().classes('items-center gap-4'):
+                        ui.spinner('dots').classes('text-primary')
+                        ui.label('Parsing visual scenes...').classes('text-lg')
+                
                 try:
-                    # Update status to show parsing phase
+                    # Generate images while the scenes are still being parsed
+                    scene_count = await generate_images(image_scene_parser.parse_images_stream(image_context))
+                except asyncio.TimeoutError:
+                    # Handle timeout case
                     status_card.clear()
                     with status_card:
-                        with ui.row().classes('items-center gap-4'):
-                            ui.spinner('dots').classes('text-primary')
-                            ui.label('Parsing visual scenes...').classes('text-lg')
-                    
-                    # Parse scenes with timeout protection
-                    async def parse_with_timeout():
-                        try:
-                            return await image_scene_parser.parse_images(image_context)
-                        except Exception as e:
-                            print(f"Error in scene parsing: {str(e)}")
-                            return None
-                    
-                    try:
-                        # Set a timeout to prevent hanging
-                        timeout_seconds = 30
-                        parsed_scenes = await asyncio.wait_for(parse_with_timeout(), timeout=timeout_seconds)
-                        
-                        # Handle case with no scenes
-                        if parsed_scenes is None or len(parsed_scenes) == 0:
-                            status_card.clear()
-                            with status_card:
-                                ui.label("No visual scenes detected in input").classes('text-warning')
-                            return
-                            
-                    except asyncio.TimeoutError:
-                        # Handle timeout case
-                        print("Timeout while waiting for scene parsing")
-                        status_card.clear()
-                        with status_card:
-                            ui.label("Scene parsing is taking longer than expected. Please wait or try again.").classes('text-warning')
-                        return
-                        
-                except Exception as e:
-                    # Handle general parsing errors
-                    print(f"Parser error: {str(e)}")
-                    results_container.clear()
-                    with results_container:
-                        with ui.card().classes('w-full p-4 bg-red-100 dark:bg-red-900'):
-                            ui.label('Error during scene parsing. Please try again.').classes('text-red-600 dark:text-red-100')
+                        ui.label("Scene parsing is taking longer than expected. Please wait or try again.").classes('text-warning')
                     return
                 
-                # Clear status and proceed to image generation
-                results_container.clear()
-                
-                if parsed_scenes and len(parsed_scenes) > 0:
-                    # Generate images for the parsed scenes
-                    await generate_images(parsed_scenes)
-                else:
-                    # Handle case with no visual scenes
-                    with results_container:
-                        ui.label("No visual scenes found in the input").classes('text-gray-400')
+                # Handle case with no scenes
+                if scene_count == 0:
+                    status_card.clear()
+                    with status_card:
+                        ui.label("No visual scenes detected in input").classes('text-warning')
                         
             except Exception as e:
                 # Handle unexpected errors
@@ -566,12 +560,35 @@ def test_image_generator_parser():
                 with results_container:
                     with ui.card().classes('w-full p-4 bg-red-100 dark:bg-red-900'):
                         ui.label(f'Error: {str(e)}').classes('text-red-600 dark:text-red-100')
-                print(f"Full error: {str(e)}")
-                import traceback
-                print(traceback.format_exc())
+                logger.exception("Image generator test failed")
+        
+        # Set while a test run is in flight
+        test_running = False
+        
+        async def run_test(e):
+            """
+            Start a test run unless one is already in progress.
+            
+            Args:
+                e: Event object from button click
+            """
+            nonlocal test_running
+            
+            # Repeated clicks would parse and generate every scene again
+            if test_running:
+                ui.notify('Generation in progress, please wait...', type='warning')
+                return
+            
+            test_running = True
+            run_button.props('loading')
+            try:
+                await execute_test()
+            finally:
+                test_running = False
+                run_button.props(remove='loading')
         
         # Button to run the test
-        ui.button('Run Test', on_click=run_test).props('icon=play_arrow color=purple')
+        run_button = ui.button('Run Test', on_click=run_test).props('icon=play_arrow color=purple')
 
 def content() -> None:
     """
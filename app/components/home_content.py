@@ -21,15 +21,87 @@ from ..core.state_manager import StateManager
 from ..core.response_parser import ResponseParser
 from app.services.qdrant_image_store import QdrantImageStore
 from app.services.embedder import get_embedder
-from app.services.store_images import StoreImages
-import httpx
+from app.services.store_images import get_image_store
+from app.services.http_client import get_http_client, fetch_bytes
+from app.services.generation_cache import get_generation_cache
+from app.utils.text import shorten
+from app.models.images import ImageEntry, MessageImages
 import asyncio
-import time
+import aiofiles
+import itertools
 import os
-import uuid
-import json
+from uuid import uuid4
+import logging
 import re
-import requests
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Semantic [[tag]] markers and their UI representations
+_TAG_MARKERS = {
+    '[[mood]]': '<span class="mood-marker">😊</span>',
+    '[[thought]]': '<span class="thought-marker">💭</span>',
+    '[[appearance]]': '<span class="appearance-marker">👤</span>',
+    '[[clothing]]': '<span class="clothing-marker">👕</span>',
+    '[[image]]': '<span class="image-marker">🖼️</span>',
+    '[[fantasy]]': '<span class="fantasy-marker">✨</span>',
+    '[[desire]]': '<span class="desire-marker">❤️</span>',
+    '[[memory]]': '<span class="memory-marker">📚</span>',
+    '[[secret]]': '<span class="secret-marker">🔒</span>'
+}
+_TAG_MARKER_RE = re.compile('|'.join(re.escape(marker) for marker in _TAG_MARKERS))
+# The markers plus the <secret> opening, for cleaning and hidden-content detection in one pass
+_DISPLAY_SCAN_RE = re.compile(_TAG_MARKER_RE.pattern + '|<secret>')
+
+def _marker_replacement(match):
+    """Map a matched [[tag]] marker to its UI representation."""
+    return _TAG_MARKERS[match.group(0)]
+
+# Parsed scenes keyed by (image tag, appearance, mood, location, stored parser state, parser settings), most recent last
+_SCENE_CACHE = OrderedDict()
+_SCENE_CACHE_SIZE = 128
+
+# Image tags of one response parsed at the same time
+_SCENE_PARSE_CONCURRENCY = 4
+
+async def _cache_lookup(cache, size, kind, key):
+    """Look up a generation result in an in-process LRU, falling back to the on-disk cache."""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+        return value
+    value = await get_generation_cache().get(kind, key)
+    if value is not None:
+        _cache_remember(cache, size, key, value)
+    return value
+
+def _cache_store(cache, size, kind, key, value):
+    """Store a generation result in an in-process LRU and queue it for the on-disk cache."""
+    _cache_remember(cache, size, key, value)
+    get_generation_cache().put(kind, key, value)
+
+def _cache_remember(cache, size, key, value):
+    """Insert into an in-process LRU, evicting the oldest entry if full."""
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > size:
+        cache.popitem(last=False)
+
+# Generated image results keyed by (scene prompt, orientation, generation settings), most recent last
+_IMAGE_CACHE = OrderedDict()
+_IMAGE_CACHE_SIZE = 128
+
+# User feedback wording keyed by the sign of a rating
+_RATING_MESSAGES = {1: "Positively", 0: "Neutrally", -1: "Negatively"}
+
+# Chat elements kept mounted; older ones are dropped (the conversation itself stays in the memory DB)
+_MAX_CHAT_ELEMENTS = 150
+
+# Minimum seconds between redraws of a streaming draft; each redraw re-renders its whole markdown
+_DRAFT_RENDER_INTERVAL = 0.1
+
+# Display ids for generated images, only unique within this process
+_IMAGE_SEQ = itertools.count()
 
 class Lightbox:
     """
@@ -44,16 +116,36 @@ class Lightbox:
     
     def __init__(self) -> None:
         """
-        Initialize the lightbox UI and state.
+        Initialize the lightbox state.
+        
+        Only the empty dialog is created here; its contents are built
+        by _build_ui the first time an image is opened, so messages whose
+        thumbnails are never clicked don't carry a full lightbox UI.
+        """
+        # Create a maximized dialog that serves as the lightbox container
+        self.dialog = ui.dialog().props('maximized').classes('bg-black')
+        self._built = False          # Whether the dialog contents exist yet
+        
+        # Internal state management
+        self.entries = []            # List of ImageEntry records in display order
+        self.current_index = 0       # Current image index being viewed
+        self.rating = 0              # Current image rating
+        self._index_by_url = {}      # Maps image URL to its index in entries
+        self._url_by_element = {}    # Maps the id of a clickable thumbnail to its image URL
+        self._click_handler = self._on_thumbnail_click  # One handler shared by all thumbnails
+        self._qdrant = QdrantImageStore()  # Shared Qdrant store used for ratings
+
+    def _build_ui(self) -> None:
+        """
+        Build the lightbox contents inside the dialog.
         
-        Creates a full-screen dialog with:
+        Creates:
         - Image display area
         - Navigation controls
         - Rating buttons
         - Prompt information display
         """
-        # Create a maximized dialog that serves as the lightbox container
-        with ui.dialog().props('maximized').classes('bg-black') as self.dialog:
+        with self.dialog:
             # Register keyboard event handler for navigation
             ui.keyboard(self._handle_key)
             
@@ -104,36 +196,50 @@ class Lightbox:
                         
                         # Status indicator for operations
                         self.status = ui.label("").classes('text-white ml-4')
-        
-        # Internal state management
-        self.image_list = []         # List of image URLs
-        self.prompt_list = []        # List of original prompts
-        self.parsed_prompt_list = [] # List of parsed prompts
-        self.id_list = []            # List of unique image IDs
-        self.current_index = 0       # Current image index being viewed
-        self.rating = 0              # Current image rating
+        self._built = True
 
-    def add_image(self, image_url: str, original_prompt: str = "", parsed_prompt: str = "", image_id: str = None) -> None:
+    def add_image(self, image_url: str, original_prompt: str = "", parsed_prompt: str = "", image_id: str = None) -> int:
         """
         Add an image to the lightbox collection.
         
+        Images already in the collection are not added again.
+        
         Args:
             image_url: URL of the image to add
             original_prompt: Original text that generated the image
             parsed_prompt: Processed prompt used for generation
             image_id: Unique ID for the image (extracts UUID from URL if not provided)
+            
+        Returns:
+            int: Index of the image in the collection
         """
-        self.image_list.append(image_url)
-        self.prompt_list.append(original_prompt)
-        self.parsed_prompt_list.append(parsed_prompt)
+        if image_url in self._index_by_url:
+            return self._index_by_url[image_url]
+        
         # Extract UUID from the image URL if no ID provided
         if image_id is None:
             try:
                 # Extract UUID from URL like: https://im.runware.ai/image/ws/2/ii/3f9a2e89-313f-47b3-a9da-b39ecff1e32a.jpg
                 image_id = image_url.split('/')[-1].split('.')[0]
             except:
-                image_id = str(uuid.uuid4())  # Fallback to new UUID if extraction fails
-        self.id_list.append(image_id)
+                image_id = uuid4().hex  # Fallback to new UUID if extraction fails
+        
+        index = len(self.entries)
+        self._index_by_url[image_url] = index
+        self.entries.append(ImageEntry(image_url, image_id, original_prompt, parsed_prompt))
+        return index
+
+    def add_images(self, images: list) -> list:
+        """
+        Add several images to the lightbox collection in one call.
+        
+        Args:
+            images: Dicts with the keyword arguments of add_image
+            
+        Returns:
+            list: Index of each image in the collection, in input order
+        """
+        return [self.add_image(**image) for image in images]
 
     def show(self, image_url: str) -> None:
         """
@@ -142,12 +248,48 @@ class Lightbox:
         Args:
             image_url: URL of the image to display
         """
-        try:
-            # Find the index of the image in our collection
-            idx = self.image_list.index(image_url)
-            self._open(self.image_list[idx])
-        except ValueError:
-            print(f"Image URL {image_url} not found in lightbox")
+        # Find the index of the image in our collection
+        idx = self._index_by_url.get(image_url)
+        if idx is None:
+            logger.debug("Image URL %s not found in lightbox", image_url)
+            return
+        self._open(image_url, idx)
+
+    def attach(self, element, image_url: str) -> None:
+        """
+        Open an image in the lightbox when an element is clicked.
+        
+        Args:
+            element: Thumbnail element that should open the image
+            image_url: URL of the image, already added with add_image
+        """
+        self._url_by_element[element.id] = image_url
+        element.on('click', self._click_handler)
+
+    def forget(self, element) -> None:
+        """
+        Drop the images of the thumbnails inside an element that is being removed.
+        
+        Args:
+            element: Chat element about to be deleted
+        
+        Images still shown by another thumbnail stay in the collection.
+        """
+        removed = {
+            self._url_by_element.pop(child.id)
+            for child in element.descendants(include_self=True)
+            if child.id in self._url_by_element
+        }
+        removed -= set(self._url_by_element.values())
+        if not removed:
+            return
+        self.entries = [entry for entry in self.entries if entry.url not in removed]
+        self._index_by_url = {entry.url: index for index, entry in enumerate(self.entries)}
+        self.current_index = min(self.current_index, max(len(self.entries) - 1, 0))
+
+    def _on_thumbnail_click(self, event_args: events.GenericEventArguments) -> None:
+        """Show the image attached to the clicked thumbnail."""
+        self.show(self._url_by_element[event_args.sender.id])
 
     def _handle_key(self, event_args: events.KeyEventArguments) -> None:
         """
@@ -181,30 +323,41 @@ class Lightbox:
         new_idx = current_idx + direction
         
         # Ensure index is within bounds
-        if 0 <= new_idx < len(self.image_list):
-            self._open(self.image_list[new_idx])
+        if 0 <= new_idx < len(self.entries):
+            self._open(self.entries[new_idx].url, new_idx)
 
-    def _open(self, url: str) -> None:
+    def _open(self, url: str, index: int = None) -> None:
         """
         Open and display an image in the lightbox.
         
         Args:
             url: URL of the image to display
+            index: Position of the image in the collection (looked up by URL if not provided)
         """
+        if not self._built:
+            self._build_ui()
+        
         # Set the image source
         self.large_image.set_source(url)
         
         # Update current index and counter
-        current_idx = self.image_list.index(url)
+        current_idx = self._index_by_url[url] if index is None else index
         self.current_index = current_idx
-        self.counter.text = f'{current_idx + 1} / {len(self.image_list)}'
+        
+        # Only touch labels whose text changed, each assignment is sent to the browser
+        counter_text = f'{current_idx + 1} / {len(self.entries)}'
+        if self.counter.text != counter_text:
+            self.counter.text = counter_text
         
         # Update prompt information
-        if current_idx < len(self.prompt_list):
-            self.original_prompt.content = f"**Original prompt:** {self.prompt_list[current_idx]}"
+        entry = self.entries[current_idx]
+        original_text = f"**Original prompt:** {entry.original_prompt}"
+        if self.original_prompt.content != original_text:
+            self.original_prompt.content = original_text
         
-        if current_idx < len(self.parsed_prompt_list):
-            self.parsed_prompt.content = f"**Parsed prompt:** {self.parsed_prompt_list[current_idx]}"
+        parsed_text = f"**Parsed prompt:** {entry.parsed_prompt}"
+        if self.parsed_prompt.content != parsed_text:
+            self.parsed_prompt.content = parsed_text
         
         # Open the dialog
         self.dialog.open()
@@ -232,30 +385,29 @@ class Lightbox:
         Args:
             rating_value: Rating value (-1 for negative, 0 for neutral, 1 for positive)
         """
+        download_task = None
         try:
             # Get current image information
             current_idx = self.current_index
-            if current_idx < 0 or current_idx >= len(self.id_list):
+            if current_idx < 0 or current_idx >= len(self.entries):
                 return
                 
-            image_id = self.id_list[current_idx]
-            image_url = self.image_list[current_idx]
-            original_prompt = self.prompt_list[current_idx]
-            parsed_prompt = self.parsed_prompt_list[current_idx]
+            entry = self.entries[current_idx]
+            image_id = entry.id
+            image_url = entry.url
+            original_prompt = entry.original_prompt
+            parsed_prompt = entry.parsed_prompt
             
-            # Determine the appropriate rating message for user feedback
-            if rating_value > 0:
-                rating_message = "Positively"
-            elif rating_value < 0:
-                rating_message = "Negatively" 
-            else:
-                rating_message = "Neutrally"
+            # Determine the appropriate rating message for user feedback from the rating's sign
+            rating_message = _RATING_MESSAGES[(rating_value > 0) - (rating_value < 0)]
                 
             self.status.text = f"{rating_message} rating image..."
             
-            # Get service instances
-            qdrant = QdrantImageStore()
-            image_store = StoreImages()
+            qdrant = self._qdrant
+            
+            # Start downloading the image while Qdrant is probed; the bytes are
+            # only needed when the image is not stored yet
+            download_task = asyncio.create_task(fetch_bytes(image_url))
             
             # First check if image already exists in Qdrant
             update_success = False
@@ -266,21 +418,18 @@ class Lightbox:
                 if result:
                     update_success = True
                     self.status.text = f"Rating updated successfully ✓"
-                    return
             except Exception as check_e:
                 # Only print if it's not a 404 error (expected when image doesn't exist yet)
                 if "404" not in str(check_e) and "Not found" not in str(check_e):
-                    print(f"Unexpected error checking image in Qdrant: {str(check_e)}")
+                    logger.warning("Unexpected error checking image in Qdrant: %s", check_e)
             
             # If update was successful, we're done
             if update_success:
                 return
                 
-            # If image doesn't exist in Qdrant, download it first
+            # If image doesn't exist in Qdrant, wait for the download
             try:
-                response = requests.get(image_url)
-                response.raise_for_status()
-                image_data = response.content
+                image_data = await download_task
             except Exception as e:
                 self.status.text = f"Failed to download image: {str(e)}"
                 return
@@ -303,7 +452,7 @@ class Lightbox:
             }
             
             # Use StoreImages service to handle the entire storage pipeline
-            result = await image_store.store_image_in_qdrant(
+            result = await get_image_store().store_image_in_qdrant(
                 image_path=temp_file,
                 image_id=image_id,
                 metadata=metadata
@@ -323,10 +472,12 @@ class Lightbox:
                 
         except Exception as e:
             # Log detailed error information
-            import traceback
-            print(f"Error storing rated image: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error storing rated image")
             self.status.text = f"Error: {str(e)}"
+        finally:
+            # Never leave the prefetch running once rating is done, whatever the outcome
+            if download_task is not None and not download_task.done():
+                download_task.cancel()
 
 # Initialize the chat pipeline
 chat_pipeline = ChatPipeline()
@@ -345,26 +496,76 @@ def clean_response_text(text):
     Returns:
         Processed text with UI representations
     """
-    # Define tag markers and their UI representations
-    tag_markers = {
-        '[[mood]]': '<span class="mood-marker">😊</span>',
-        '[[thought]]': '<span class="thought-marker">💭</span>',
-        '[[appearance]]': '<span class="appearance-marker">👤</span>',
-        '[[clothing]]': '<span class="clothing-marker">👕</span>',
-        '[[image]]': '<span class="image-marker">🖼️</span>',
-        '[[fantasy]]': '<span class="fantasy-marker">✨</span>',
-        '[[desire]]': '<span class="desire-marker">❤️</span>',
-        '[[memory]]': '<span class="memory-marker">📚</span>',
-        '[[secret]]': '<span class="secret-marker">🔒</span>'
-    }
+    # Most messages carry no markers at all, skip the regex pass for them
+    if '[[' not in text:
+        return text
+    
+    # Replace all tag markers with their UI representations in a single scan
+    return _TAG_MARKER_RE.sub(_marker_replacement, text)
+
+def clean_and_check(text):
+    """
+    Process the [[tag]] markers for display and detect secret content in one scan.
+    
+    Args:
+        text: Raw text with semantic markers
+        
+    Returns:
+        Tuple of (processed text, whether secret content is present)
+    """
+    # Most messages carry no markers at all, a substring check settles those
+    if '[[' not in text:
+        return text, '<secret>' in text
+    
+    hidden = False
     
-    # Replace all tag markers with their UI representations
-    for marker, replacement in tag_markers.items():
-        text = text.replace(marker, replacement)
+    def replace(match):
+        nonlocal hidden
+        marker = match.group(0)
+        if marker == '<secret>':
+            hidden = True
+            return marker
+        if marker == '[[secret]]':
+            hidden = True
+        return _TAG_MARKERS[marker]
+    
+    return _DISPLAY_SCAN_RE.sub(replace, text), hidden
+
+def render_image_card(description, frame_text=None, image_url=None):
+    """
+    Build the thumbnail card used for every generated image in the chat.
+    
+    Args:
+        description: Image description shown (truncated) under the thumbnail
+        frame_text: Optional frame/orientation label
+        image_url: Image URL if already known; otherwise a loading spinner is shown
+        
+    Returns:
+        Tuple of (button, image, spinner) elements; spinner is None when image_url is given
+    """
+    with ui.card().classes('q-pa-xs'):
+        # Loading spinner (shown during generation)
+        loading = None
+        if image_url is None:
+            loading = ui.spinner('default', size='xl').props('color=primary')
+        
+        # Image container (clickable for lightbox)
+        container = ui.button().props('flat dense').classes('w-[120px] h-[120px] overflow-hidden')
+        with container:
+            img = ui.image(image_url or '').props('fit=cover').classes('w-full h-full object-cover')
+            img.visible = image_url is not None
+        
+        # Description and frame info, the row wrapper is only needed to lay out both labels
+        if frame_text:
+            with ui.row().classes('items-center justify-between q-mt-xs'):
+                ui.label(shorten(description)).classes('text-caption text-grey-5 ellipsis')
+                ui.label(frame_text).classes('text-caption text-grey-5')
+        else:
+            ui.label(shorten(description)).classes('text-caption text-grey-5 ellipsis q-mt-xs')
     
-    return text
+    return container, img, loading
 
-def display_message(chat_box, response, memory_system):
+def display_message(chat_box, response, memory_system, lightbox):
     """
     Display a message in the chat box with proper formatting and tag handling.
     
@@ -376,114 +577,49 @@ def display_message(chat_box, response, memory_system):
     
     Args:
         chat_box: UI container for messages
-        response: Response data including text and images
+        response: Response data including text and images (MessageImages)
         memory_system: Reference to the memory system
+        lightbox: Lightbox shared by every message of the chat
     """
     # Create a message container for text and related images
     with chat_box:
         with ui.card().classes('self-start bg-gray-700 p-3 rounded-lg mb-3 max-w-3/4 border-l-4 border-blue-500') as card:
-            # Clean response text by removing image tags before displaying
-            cleaned_text = clean_response_text(response['text'])
+            text = response['text']
+            
+            # Clean response text and look for hidden content in the same scan
+            cleaned_text, hidden = clean_and_check(text)
             ui.markdown(cleaned_text).classes('text-white')
             
             # Add indicator for hidden content if present
-            if has_hidden_content(response['text']):
+            if hidden:
                 with ui.row().classes('justify-end items-center mt-1'):
                     ui.icon('lock', color='grey').classes('text-xs')
             
             # Display generated images if present
-            if response.get("images") and len(response["images"]) > 0:
+            images = response.get("images")
+            if images:
                 ui.separator().classes('my-2')
                 with ui.row().classes('q-gutter-sm flex-wrap justify-center'):
-                    # Create a single lightbox for all images
-                    current_lightbox = Lightbox()
+                    # Register the whole message's images with the lightbox up front
+                    lightbox.add_images([
+                        {"image_url": image_url, "original_prompt": original_prompt, "parsed_prompt": parsed_prompt}
+                        for image_url, original_prompt, parsed_prompt in zip(
+                            images.urls, images.original_prompts, images.parsed_prompts
+                        )
+                    ])
                     
-                    # Create placeholder arrays to track tasks and containers
-                    tasks = []
-                    containers = []
-                    
-                    # FIRST: Create UI containers for all images before any processing
-                    for image_data in response["images"]:
-                        if isinstance(image_data, dict) and "url" in image_data and "description" in image_data:
-                            try:
-                                # Build card for each image
-                                with ui.card().classes('q-pa-xs'):
-                                    # Loading spinner (shown during generation)
-                                    loading = ui.spinner('default', size='xl').props('color=primary')
-                                    
-                                    # Image container (clickable for lightbox)
-                                    container = ui.button().props('flat dense').classes('w-[120px] h-[120px] overflow-hidden')
-                                    with container:
-                                        img = ui.image().props('fit=cover').classes('w-full h-full object-cover')
-                                        img.visible = False
-                                    
-                                    # Description and frame info
-                                    with ui.row().classes('items-center justify-between q-mt-xs'):
-                                        # Truncate long descriptions
-                                        desc = image_data["description"][:30] + "..." if len(image_data["description"]) > 30 else image_data["description"]
-                                        ui.label(desc).classes('text-caption text-grey-5 ellipsis')
-                                        
-                                        # Show frame number if available
-                                        orientation = image_data.get("orientation", "")
-                                        frame = image_data.get("frame", None)
-                                        if orientation or frame:
-                                            frame_text = f"[Frame {frame} | {orientation}]" if frame else f"[{orientation}]"
-                                            ui.label(frame_text).classes('text-caption text-grey-5')
-                                    
-                                    # Track task and container for later updates
-                                    tasks.append({
-                                        'scene': image_data,
-                                        'loading': loading,
-                                        'img': img,
-                                        'button': container
-                                    })
-                                    containers.append(container)
-                            except Exception as e:
-                                print(f"Error setting up image display: {str(e)}")
-                                ui.notify(f"Error setting up image display: {str(e)}", type='negative')
-                    
-                    # SECOND: Now update all the images after UI has been created
-                    for i, task in enumerate(tasks):
+                    # Build each card with its own image URL bound up front; the URLs are
+                    # already known here, so cards, sources and click handlers are set in one pass
+                    for image_url, description, frame_text in zip(
+                        images.urls, images.descriptions, images.frame_texts
+                    ):
                         try:
-                            # Get the current image data
-                            current_image = response["images"][i]
-                            
-                            # Get the original and parsed prompts from the image data
-                            scene_data = current_image.get("scene_data", {})
-                            original_prompt = scene_data.get("original_text", current_image.get("description", ""))
-                            parsed_prompt = scene_data.get("prompt", current_image.get("description", ""))
-                            
-                            # Add to lightbox
-                            current_lightbox.add_image(
-                                image_url=current_image["url"],
-                                original_prompt=original_prompt,
-                                parsed_prompt=parsed_prompt
-                            )
-                            
-                            # Update UI elements
-                            task['loading'].visible = False
-                            task['img'].set_source(current_image["url"])
-                            task['img'].visible = True
-                            
-                            # Setup lightbox click handler
-                            task['button'].on('click', lambda url=current_image["url"]: current_lightbox.show(url))
+                            # Build card for each image and setup lightbox click handler
+                            container, _, _ = render_image_card(description, frame_text, image_url)
+                            lightbox.attach(container, image_url)
                         except Exception as e:
-                            print(f"Error updating image display: {str(e)}")
-                            task['loading'].visible = False
-                            ui.label('Display failed').classes('text-caption text-negative')
-
-# Function to check if text contains hidden content tags
-def has_hidden_content(text):
-    """
-    Check if the text contains any secret content tags.
-    
-    Args:
-        text: Text to check for secret markers
-        
-    Returns:
-        bool: True if secret content is present
-    """
-    return '[[secret]]' in text
+                            logger.error("Error setting up image display: %s", e)
+                            ui.notify(f"Error setting up image display: {str(e)}", type='negative')
 
 def content() -> None:
     """
@@ -520,24 +656,16 @@ def content() -> None:
     # Track if we have a message processing task running
     is_processing = False
     
-    # Heartbeat mechanism to keep connection alive during long operations
-    def setup_heartbeat():
+    def update_panel(display, text):
         """
-        Creates a heartbeat task to keep the connection alive during long operations.
+        Update a character panel only when its content actually changed.
         
-        Returns:
-            Background task that periodically pings the UI
+        Args:
+            display: Markdown element of the panel (mood, appearance, ...)
+            text: New content for the panel
         """
-        async def heartbeat_task():
-            """Send small UI updates every few seconds to keep the websocket connection alive."""
-            heartbeat_counter = 0
-            while is_processing:
-                # Just ping with a UI update to keep connection alive
-                ui.update()
-                heartbeat_counter += 1
-                await asyncio.sleep(3)  # Send a heartbeat every 3 seconds
-        
-        return background_tasks.create(heartbeat_task())
+        if display.content != text:
+            display.content = text
     
     async def set_as_portrait(image_url):
         """
@@ -547,15 +675,13 @@ def content() -> None:
             image_url: URL of the image to set as portrait
         """
         try:
-            # Download the image
-            async with httpx.AsyncClient() as client:
-                response = await client.get(image_url)
+            # Stream the image straight into the assets directory
+            portrait_path = 'app/assets/images/portrait.jpg'
+            async with get_http_client().stream('GET', image_url) as response:
                 response.raise_for_status()
-                
-                # Save to assets directory
-                portrait_path = 'app/assets/images/portrait.jpg'
-                with open(portrait_path, 'wb') as f:
-                    f.write(response.content)
+                async with aiofiles.open(portrait_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(65536):
+                        await f.write(chunk)
             
             # Update the portrait in the UI
             if portrait_ref:
@@ -624,26 +750,29 @@ def content() -> None:
                 with chat_container:
                     chat_box = ui.column().classes('p-6 bg-[#1a1a1a] rounded w-full')
                 
+                # One lightbox for every image of this chat, kept outside chat_box so trimming never removes it
+                lightbox = Lightbox()
+                
+                def trim_chat_history():
+                    """Drop the oldest chat elements so the mounted chat stays bounded on long sessions."""
+                    overflow = len(chat_box.default_slot.children) - _MAX_CHAT_ELEMENTS
+                    for _ in range(overflow):
+                        # Release the lightbox images of the element too, or the gallery keeps growing
+                        lightbox.forget(chat_box.default_slot.children[0])
+                        chat_box.remove(0)
+                
                 # Function to display image details
                 def show_image_details(image_data):
                     """Show image details in the lightbox."""
-                    # Create a new lightbox and add just this image
-                    temp_lightbox = Lightbox()
-                    temp_lightbox.add_image(
+                    # Add the image to the chat's lightbox, a no-op if it is already there
+                    lightbox.add_image(
                         image_url=image_data["url"],
                         original_prompt=image_data.get("original_prompt", ""),
                         parsed_prompt=image_data.get("parsed_prompt", "")
                     )
                     
-                    # Set the index and open it directly
-                    temp_lightbox.current_index = 0
-                    
-                    # Execute the open function on the UI thread
-                    def open_lightbox():
-                        temp_lightbox._open()
-                    
-                    # Run on the UI thread with a small delay
-                    ui.timer(0.1, open_lightbox, once=True)
+                    # Open it directly, handlers already run on the event loop
+                    lightbox.show(image_data["url"])
                 
                 # Message input and send button
                 with ui.row().classes('gap-4 mt-auto w-full'):
@@ -691,9 +820,10 @@ def content() -> None:
                             with spinner_row:
                                 ui.spinner('dots', size='lg', color='primary')
                                 phase_label = ui.label('Thinking...').classes('text-gray-400 ml-2')
+                        trim_chat_history()
                         
-                        # Ensure UI updates before continuing
-                        ui.update()
+                        # The user bubble and spinner are flushed together with the next
+                        # outbox update, no forced ui.update() needed here
 
                         async def process_message():
                             """
@@ -706,8 +836,20 @@ def content() -> None:
                             4. Manages state changes
                             """
                             nonlocal is_processing
-                            # Start a heartbeat to keep connection alive
-                            heartbeat_task = setup_heartbeat()
+                            
+                            # Draft response card, tracked so cleanup can remove it directly
+                            temp_response = None
+                            
+                            def drop_drafts():
+                                """Remove the draft response card and the spinner row, each at most once."""
+                                nonlocal temp_response, spinner_row
+                                # Skip drafts that are already gone, e.g. trimmed off the top of a long chat
+                                if temp_response is not None and not temp_response.is_deleted:
+                                    chat_box.remove(temp_response)
+                                temp_response = None
+                                if spinner_row is not None and not spinner_row.is_deleted:
+                                    chat_box.remove(spinner_row)
+                                spinner_row = None
                             
                             try:
                                 if test_mode:
@@ -731,30 +873,26 @@ def content() -> None:
                                     for word in words:
                                         current_text += word + " "
                                         streaming_text.content = current_text
-                                        ui.update()
                                         await asyncio.sleep(0.1)  # 100ms delay between words
                                     
                                     # Update status to show processing
                                     streaming_text.content = current_text + "\n\n*Processing response...*"
                                     
-                                    # Process the raw response through the response parser for text content
-                                    # while simultaneously processing image content
+                                    # Process the raw response through the response parser, one pass
+                                    # extracts the text, state tags and image descriptions together
                                     response_parser = ResponseParser()
+                                    parsed_response = response_parser.parse_response(raw_mock_response)
                                     
-                                    # Look for any image tags in the original message - this is separate from response parsing
-                                    image_tags = re.findall(r'(?:<image>|\[\[image\]\])(.*?)(?:</image>|\[\[/image\]\])', current_message, re.DOTALL)
+                                    image_tags = parsed_response['images']
                                     has_images = len(image_tags) > 0
                                     
-                                    # Process response through ResponseParser
-                                    parsed_response = response_parser.parse_response(raw_mock_response)
-                                    
                                     # Log parsed response for debugging
-                                    print(f"ResponseParser output: {parsed_response}")
+                                    logger.debug("ResponseParser output: %s", parsed_response)
                                     
                                     # Create the mock response based on the parsed output
                                     mock_response = {
                                         'text': parsed_response.get('main_text', raw_mock_response),
-                                        'images': []
+                                        'images': MessageImages()
                                     }
                                     
                                     # Include other elements if present in the parsed response
@@ -773,223 +911,276 @@ def content() -> None:
                                     if 'location' in parsed_response:
                                         mock_response['location'] = parsed_response['location']
                                         
-                                    # Show the parsed content in the UI
-                                    streaming_text.content = clean_response_text(mock_response['text'])
+                                    # Show the parsed content in the UI, with the image status appended
+                                    # in the same update when images follow
+                                    display_text = clean_response_text(mock_response['text'])
+                                    streaming_text.content = display_text + "\n\n*Processing image scenes...*" if has_images else display_text
                                     
                                     # Process images if available
                                     image_scenes = []
                                     if has_images:
-                                        # Update status in UI
-                                        streaming_text.content = clean_response_text(mock_response['text']) + "\n\n*Processing image scenes...*"
                                         
-                                        # Create image context for the parser
-                                        current_appearance = memory_system.get_recent_appearances(1)
-                                        current_appearance_text = current_appearance[0]["description"] if current_appearance else None
-                                        current_mood = memory_system.get_current_mood()
-                                        current_location = memory_system.get_recent_locations(1)
-                                        current_location_text = current_location[0]["description"] if current_location else None
+                                        # Create image context for the parser, preferring the state this
+                                        # response just set and falling back to one snapshot of the stored state
+                                        character_state = memory_system.get_character_state()
+                                        current_appearance_text = (parsed_response['appearance'][-1] if parsed_response['appearance']
+                                                                   else character_state.get("appearance"))
+                                        current_mood = parsed_response['mood'] or character_state.get("mood", "neutral")
+                                        current_location_text = parsed_response['location'] or character_state.get("location")
                                         
-                                        # Create image context
-                                        image_context = {
+                                        # Parse each image tag on its own so the slow parser calls run side by
+                                        # side, bounded so a long response doesn't flood the parser endpoint
+                                        parse_limit = asyncio.Semaphore(_SCENE_PARSE_CONCURRENCY)
+                                        
+                                        # The character state is the same for every tag of the response
+                                        state_context = {
                                             "appearance": current_appearance_text,
                                             "mood": current_mood,
-                                            "location": current_location_text,
-                                            "images": [{"content": content, "sequence": i+1} for i, content in enumerate(image_tags)]
+                                            "location": current_location_text
                                         }
                                         
-                                        # Parse scenes using the actual parser
-                                        image_scenes = await chat_pipeline.image_scene_parser.parse_images(
-                                            json.dumps(image_context),
-                                            current_appearance=current_appearance_text
-                                        )
+                                        # The parser also puts the stored state into its prompt (clothing included),
+                                        # so cached scenes are only valid for the same stored state
+                                        parser_state = tuple(character_state.get(key) for key in ("appearance", "mood", "clothing", "location"))
+                                        
+                                        # Scenes and images from another model, prompt or config must not be served again
+                                        parser_settings = chat_pipeline.image_scene_parser.settings_key()
+                                        image_settings = chat_pipeline.image_generator.settings_key()
+                                        
+                                        async def parse_tag(i, content):
+                                            # Reuse parsed scenes for an identical tag and state, the parser is a slow LLM call
+                                            scene_key = (content, current_appearance_text, current_mood, current_location_text, parser_state, parser_settings)
+                                            scenes = await _cache_lookup(_SCENE_CACHE, _SCENE_CACHE_SIZE, "scenes", scene_key)
+                                            if scenes is not None:
+                                                return scenes
+                                            
+                                            # Create image context, only needed when the parser has to run
+                                            image_context = {**state_context, "images": [{"content": content, "sequence": i + 1}]}
+                                            
+                                            # Isolate failures per tag so one bad parse doesn't drop the other images
+                                            async with parse_limit:
+                                                try:
+                                                    scenes = await chat_pipeline.image_scene_parser.parse_images(
+                                                        image_context,
+                                                        current_appearance=current_appearance_text
+                                                    )
+                                                except Exception as e:
+                                                    logger.error("Error parsing image %d: %s", i + 1, e)
+                                                    return []
+                                            
+                                            if scenes:
+                                                _cache_store(_SCENE_CACHE, _SCENE_CACHE_SIZE, "scenes", scene_key, scenes)
+                                            return scenes or []
+                                        
+                                        # Keep the scenes in tag order whatever order the parses finish in
+                                        parsed_groups = await asyncio.gather(*(parse_tag(i, content) for i, content in enumerate(image_tags)))
+                                        image_scenes = [scene for group in parsed_groups for scene in group]
                                         
                                         if image_scenes:
                                             # Create UI containers for all images before any processing
                                             with chat_box:
-                                                # Create a single lightbox for all images
-                                                current_lightbox = Lightbox()
-                                                
-                                                # Create placeholder arrays to track tasks and containers
+                                                # One (card, image, spinner) slot per scene, filled in as results arrive
                                                 tasks = []
-                                                containers = []
                                                 
                                                 # Create UI containers for all images before any processing
                                                 for scene in image_scenes:
                                                     try:
                                                         # Build card for each image
-                                                        with ui.card().classes('q-pa-xs'):
-                                                            # Loading spinner (shown during generation)
-                                                            loading = ui.spinner('default', size='xl').props('color=primary')
-                                                            
-                                                            # Image container (clickable for lightbox)
-                                                            container = ui.button().props('flat dense').classes('w-[120px] h-[120px] overflow-hidden')
-                                                            with container:
-                                                                img = ui.image().props('fit=cover').classes('w-full h-full object-cover')
-                                                                img.visible = False
-                                                            
-                                                            # Description and frame info
-                                                            with ui.row().classes('items-center justify-between q-mt-xs'):
-                                                                # Truncate long descriptions
-                                                                desc = scene.get("content", scene.get("prompt", ""))[:30] + "..." if len(scene.get("content", scene.get("prompt", ""))) > 30 else scene.get("content", scene.get("prompt", ""))
-                                                                ui.label(desc).classes('text-caption text-grey-5 ellipsis')
-                                                                
-                                                                # Show frame number if available
-                                                                frame = scene.get("frame", None)
-                                                                if frame:
-                                                                    ui.label(f"[Frame {frame}]").classes('text-caption text-grey-5')
-                                                            
-                                                            # Track task and container for later updates
-                                                            tasks.append({
-                                                                'scene': scene,
-                                                                'loading': loading,
-                                                                'img': img,
-                                                                'button': container
-                                                            })
-                                                            containers.append(container)
+                                                        frame = scene.get("frame", None)
+                                                        tasks.append(render_image_card(
+                                                            scene.get("content", scene.get("prompt", "")),
+                                                            f"[Frame {frame}]" if frame else None
+                                                        ))
                                                     except Exception as e:
-                                                        print(f"Error setting up image display: {str(e)}")
+                                                        # Keep slots aligned with scene indices
+                                                        tasks.append(None)
+                                                        logger.error("Error setting up image display: %s", e)
                                                         ui.notify(f"Error setting up image display: {str(e)}", type='negative')
                                             
                                             # Update status to show image generation
-                                            streaming_text.content = clean_response_text(mock_response['text']) + "\n\n*Generating images...*"
+                                            streaming_text.content = display_text + "\n\n*Generating images...*"
                                             
-                                            # Generate images using the actual generator
-                                            image_urls = await chat_pipeline.image_generator.generate(image_scenes)
+                                            # Generate one image per scene so each thumbnail shows up as soon
+                                            # as its own request finishes instead of waiting for the slowest one
+                                            async def generate_scene(i, scene):
+                                                # A scene that was already rendered reuses its image instead of another generation
+                                                image_key = (scene.get("prompt", ""), scene.get("orientation", "portrait"), image_settings)
+                                                cached_image = await _cache_lookup(_IMAGE_CACHE, _IMAGE_CACHE_SIZE, "image", image_key)
+                                                if cached_image is not None:
+                                                    return i, cached_image
+                                                
+                                                # Isolate failures per scene so one bad image doesn't abort the others
+                                                try:
+                                                    result = await chat_pipeline.image_generator.generate_one(scene)
+                                                except Exception as e:
+                                                    logger.error("Error generating image %d: %s", i + 1, e)
+                                                    return i, None
+                                                
+                                                if result:
+                                                    _cache_store(_IMAGE_CACHE, _IMAGE_CACHE_SIZE, "image", image_key, result)
+                                                return i, result
+                                            
+                                            generated_images = [None] * len(image_scenes)
                                             
-                                            # Process results
-                                            for i, image_url in enumerate(image_urls):
+                                            # Process results in completion order
+                                            for next_done in asyncio.as_completed([generate_scene(i, scene) for i, scene in enumerate(image_scenes)]):
+                                                i, image_url = await next_done
+                                                slot = tasks[i]
                                                 if image_url:
-                                                    # Get the sequence number from the frame field if present, otherwise use index + 1
-                                                    sequence = image_scenes[i].get("frame", i + 1)
+                                                    scene = image_scenes[i]
+                                                    url = image_url['url']
                                                     try:
-                                                        image_uuid = image_url['url'].split('/')[-1].split('.')[0]
+                                                        image_uuid = url.split('/')[-1].split('.')[0]
                                                     except:
-                                                        image_uuid = f"img_{int(time.time())}_{i}"
+                                                        image_uuid = f"img{next(_IMAGE_SEQ)}"
                                                     
                                                     # Get the original content from the corresponding scene
-                                                    original_prompt = image_scenes[i].get("original_text", "")
-                                                    parsed_prompt = image_scenes[i].get("prompt", "")
+                                                    original_prompt = scene.get("original_text", "")
+                                                    parsed_prompt = scene.get("prompt", "")
+                                                    description = scene.get("content", scene.get("prompt", "Generated image"))
                                                     
-                                                    mock_response['images'].append({
-                                                        "url": image_url['url'],
-                                                        "description": image_scenes[i].get("content", image_scenes[i].get("prompt", "Generated image")),
-                                                        "id": image_uuid,
-                                                        "sequence": sequence,
-                                                        "original_prompt": original_prompt,
-                                                        "parsed_prompt": parsed_prompt,
-                                                        "scene_data": image_scenes[i]  # Include the full scene data
-                                                    })
+                                                    # Label the final card with the scene's frame and orientation
+                                                    frame = scene.get("frame")
+                                                    orientation = scene.get("orientation", "")
+                                                    frame_text = None
+                                                    if orientation or frame:
+                                                        frame_text = f"[Frame {frame} | {orientation}]" if frame else f"[{orientation}]"
+                                                    
+                                                    generated_images[i] = (
+                                                        url,
+                                                        image_uuid,
+                                                        description,
+                                                        original_prompt or description,
+                                                        parsed_prompt or description,
+                                                        frame_text
+                                                    )
+                                                    
+                                                    if slot is None:
+                                                        continue
+                                                    button, img, loading = slot
                                                     
                                                     # Update UI elements
-                                                    tasks[i]['loading'].visible = False
-                                                    tasks[i]['img'].set_source(image_url['url'])
-                                                    tasks[i]['img'].visible = True
+                                                    loading.visible = False
+                                                    img.set_source(url)
+                                                    img.visible = True
                                                     
                                                     # Add to lightbox
-                                                    current_lightbox.add_image(
-                                                        image_url=image_url['url'],
+                                                    lightbox.add_image(
+                                                        image_url=url,
                                                         original_prompt=original_prompt,
                                                         parsed_prompt=parsed_prompt
                                                     )
                                                     
                                                     # Setup lightbox click handler
-                                                    tasks[i]['button'].on('click', lambda url=image_url['url']: current_lightbox.show(url))
+                                                    lightbox.attach(button, url)
+                                                elif slot is not None:
+                                                    # Show an error tile in place of the spinner for this slot only
+                                                    button, img, loading = slot
+                                                    loading.visible = False
+                                                    with button:
+                                                        ui.icon('broken_image', color='negative').classes('text-4xl')
                                             
-                                            # Create a function to safely display the message on the UI thread
-                                            def safe_display():
-                                                try:
-                                                    # First try to remove the temporary response
-                                                    chat_box.remove(temp_response)
-                                                except (ValueError, Exception) as e:
-                                                    print(f"Error removing temp response: {e}")
-                                                    pass
-                                                
-                                                # Display the final response with images in the correct UI context
-                                                with chat_box:
-                                                    display_message(chat_box, mock_response, memory_system)
-                                            
-                                            # Execute the display function on the UI thread with a timer
-                                            ui.timer(0.1, safe_display, once=True)
-                                        
-                                    # No images case is now handled directly in the safe_display function
-                                    # Update state displays
-                                    if mock_response.get("mood"):
-                                        memory_system.update_mood(mock_response["mood"])
-                                        mood_display.content = mock_response["mood"]
+                                            # Keep the final message images in scene order
+                                            for image in generated_images:
+                                                if image:
+                                                    mock_response['images'].append(*image)
                                     
-                                    if mock_response.get("thoughts"):
-                                        for thought in mock_response["thoughts"]:
-                                            memory_system.add_thought(thought)
-                                            # Update display with the current thought from state manager
-                                            thoughts_display.content = memory_system.state_manager.get_current_thought()
+                                    # Replace the temporary response with the final one right away,
+                                    # this coroutine already runs on the UI event loop
+                                    drop_drafts()
+                                    display_message(chat_box, mock_response, memory_system, lightbox)
+                                        
+                                else:
+                                    # Stream the LLM response into a temporary message card as tokens arrive
+                                    with chat_box:
+                                        temp_response = ui.card().classes('self-start bg-gray-700 p-3 rounded-lg mb-3 max-w-3/4 border-l-4 border-blue-500')
+                                        with temp_response:
+                                            streaming_text = ui.markdown("").classes('text-white')
                                     
-                                    if mock_response.get("appearance"):
-                                        for appearance in mock_response["appearance"]:
-                                            memory_system.add_appearance(appearance)
-                                        # Update with the last appearance
-                                        if mock_response["appearance"]:
-                                            appearance_display.content = mock_response["appearance"][-1] 
+                                    mock_response = None
+                                    streamed_tokens = []
+                                    next_render = 0.0
+                                    clock = asyncio.get_running_loop().time
+                                    async for update in chat_pipeline.process_message(current_message):
+                                        if update["type"] == "stream":
+                                            # Tokens arrive much faster than the draft needs redrawing
+                                            streamed_tokens.append(update["token"])
+                                            now = clock()
+                                            if now >= next_render:
+                                                streaming_text.content = "".join(streamed_tokens)
+                                                next_render = now + _DRAFT_RENDER_INTERVAL
+                                        elif update["type"] == "final":
+                                            mock_response = {
+                                                'text': update["parsed_text"],
+                                                'images': MessageImages(),
+                                                'mood': update.get("mood"),
+                                                'thoughts': update.get("thoughts", []),
+                                                'appearance': update.get("appearance", []),
+                                                'clothing': update.get("clothing", [])
+                                            }
+                                        elif update["type"] == "error":
+                                            raise Exception(update["message"])
                                     
-                                    if mock_response.get("clothing"):
-                                        for clothing in mock_response["clothing"]:
-                                            memory_system.add_clothing(clothing)
-                                        # Update with the last clothing
-                                        if mock_response["clothing"]:
-                                            clothing_display.content = mock_response["clothing"][-1]
+                                    # A stream that ends without a final update has nothing to display
+                                    if mock_response is None:
+                                        raise Exception("The response ended before it was complete. Please try again.")
                                     
-                                    # Add conversation to memory system (mimicking normal flow)
-                                    memory_system.add_conversation_entry("user", current_message)
-                                    memory_system.add_conversation_entry("assistant", mock_response["text"])
+                                    # Replace the streamed draft with the final parsed message
+                                    drop_drafts()
+                                    display_message(chat_box, mock_response, memory_system, lightbox)
                                 
                                 # No images case is now handled directly in the safe_display function
+                                # Read the response fields once
+                                response_text = mock_response["text"]
+                                mood = mock_response.get("mood")
+                                # Drop blank tags up front so they are neither stored nor displayed
+                                thoughts = [t for t in mock_response.get("thoughts") or () if t.strip()]
+                                appearances = [a for a in mock_response.get("appearance") or () if a.strip()]
+                                clothing_items = [c for c in mock_response.get("clothing") or () if c.strip()]
+                                
+                                # All state tags of the turn are stored with a single state save
+                                memory_system.apply_updates({
+                                    "mood": [mood] if mood else [],
+                                    "appearance": appearances,
+                                    "clothing": clothing_items
+                                })
+                                
                                 # Update state displays
-                                if mock_response.get("mood"):
-                                    memory_system.update_mood(mock_response["mood"])
-                                    mood_display.content = mock_response["mood"]
+                                if mood:
+                                    update_panel(mood_display, mood)
                                 
-                                if mock_response.get("thoughts"):
-                                    for thought in mock_response["thoughts"]:
-                                        memory_system.add_thought(thought)
-                                        # Update display with the current thought from state manager
-                                        thoughts_display.content = memory_system.state_manager.get_current_thought()
+                                if thoughts:
+                                    update_panel(thoughts_display, thoughts[-1])
                                 
-                                if mock_response.get("appearance"):
-                                    for appearance in mock_response["appearance"]:
-                                        memory_system.add_appearance(appearance)
+                                if appearances:
                                     # Update with the last appearance
-                                    if mock_response["appearance"]:
-                                        appearance_display.content = mock_response["appearance"][-1] 
+                                    update_panel(appearance_display, appearances[-1])
                                 
-                                if mock_response.get("clothing"):
-                                    for clothing in mock_response["clothing"]:
-                                        memory_system.add_clothing(clothing)
+                                if clothing_items:
                                     # Update with the last clothing
-                                    if mock_response["clothing"]:
-                                        clothing_display.content = mock_response["clothing"][-1]
+                                    update_panel(clothing_display, clothing_items[-1])
                                 
-                                # Add conversation to memory system (mimicking normal flow)
-                                memory_system.add_conversation_entry("user", current_message)
-                                memory_system.add_conversation_entry("assistant", mock_response["text"])
+                                # Embed thoughts and add the conversation to the memory system off the
+                                # event loop, the message and panels above are already on screen
+                                results = await asyncio.gather(
+                                    memory_system.add_thoughts(thoughts),
+                                    memory_system.add_conversation_entries([
+                                        ("user", current_message),
+                                        ("assistant", response_text)
+                                    ]),
+                                    return_exceptions=True
+                                )
+                                for result in results:
+                                    if isinstance(result, Exception):
+                                        logger.error("Error saving to memory: %s", result)
+                                        ui.notify(f"Error saving to memory: {str(result)}", type='negative')
                             
                             except asyncio.TimeoutError:
-                                try:
-                                    chat_box.remove(temp_response)
-                                except (ValueError, NameError):
-                                    # Already removed or doesn't exist
-                                    pass
-                                    
-                                chat_box.remove(spinner_row)
+                                drop_drafts()
                                 with chat_box:
                                     ui.label("Response generation timed out. Please try a shorter message.").classes('self-start bg-red-800 p-2 rounded-lg mb-2')
                             except Exception as e:
-                                try:
-                                    chat_box.remove(temp_response)
-                                except (ValueError, NameError):
-                                    # Already removed or doesn't exist
-                                    pass
-                                    
-                                if 'spinner_row' in locals():
-                                    chat_box.remove(spinner_row)
+                                drop_drafts()
                                 with chat_box:
                                     ui.label(f"Error: {str(e)}").classes('self-start bg-red-800 p-2 rounded-lg mb-2')
                             finally:
@@ -1006,11 +1197,14 @@ def content() -> None:
                     
                     # Allow pressing Enter to send
                     def on_key_press(e):
-                        """Handle key press events for the input field."""
-                        if e.args.get('key') == 'Enter' and not e.args.get('shiftKey'):
-                            send_message()
+                        """Handle Enter key presses for the input field."""
+                        # Shift+Enter inserts a newline; IME composition and key auto-repeat never send
+                        if e.args.get('shiftKey') or e.args.get('isComposing') or e.args.get('repeat'):
+                            return
+                        send_message()
                     
-                    msg_input.on('keydown', on_key_press)
+                    # Only Enter keydowns reach the server, throttled so a double press sends once
+                    msg_input.on('keydown.enter', on_key_press, throttle=0.25, trailing_events=False)
 
         # Right Card - Location Information
         with ui.card().classes('flex-1 max-w-[768px]'):
@@ -2,11 +2,19 @@ from nicegui import ui, events
 from app.services.qdrant_image_store import QdrantImageStore
 from app.core.memory_system import MemorySystem
 from app.services.embedder import get_embedder
+from app.services.embed_cache import get_embed_cache
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ImageRating:
     """Handles image rating and storage in Qdrant"""
     def __init__(self) -> None:
         self.status = ui.label("").classes('text-white ml-4')
+        self._qdrant = QdrantImageStore()   # Shared Qdrant store, reused across rating clicks
+        self._embedder = get_embedder()     # Shared embedder, reused across rating clicks
         
     async def rate_image(self, image_id: str, image_url: str, original_prompt: str, parsed_prompt: str, rating_value: int) -> None:
         """Store image in Qdrant with specified rating"""
@@ -21,9 +29,9 @@ class ImageRating:
                 
             self.status.text = f"{rating_message} rating image..."
             
-            # Get embedder and Qdrant client
-            embedder = get_embedder()
-            qdrant = QdrantImageStore()
+            # Reuse the embedder and Qdrant client bound at construction
+            embedder = self._embedder
+            qdrant = self._qdrant
             
             # First check if the image already exists in Qdrant
             update_success = False
@@ -38,7 +46,7 @@ class ImageRating:
             except Exception as check_e:
                 # Only print if it's not a 404 error (expected when image doesn't exist yet)
                 if "404" not in str(check_e) and "Not found" not in str(check_e):
-                    print(f"Unexpected error checking image in Qdrant: {str(check_e)}")
+                    logger.warning("Unexpected error checking image in Qdrant: %s", check_e)
             
             if update_success:
                 return
@@ -51,14 +59,25 @@ class ImageRating:
             current_location = memory_system.get_recent_locations(1)
             current_location_text = current_location[0]["description"] if current_location else None
             
-            # Embed the image
-            image_vector, thumbnail_b64 = embedder.embed_image_from_url(image_url)
-            if image_vector is None:
-                self.status.text = "Failed to embed image"
-                return
+            # Reuse the embedding from an earlier attempt if we have one
+            embed_cache = get_embed_cache()
+            cached = await embed_cache.get(image_id)
+            if cached is not None:
+                image_vector, thumbnail_b64 = cached
+            else:
+                # Embed the image off the event loop, download and inference both block
+                loop = asyncio.get_event_loop()
+                image_vector, thumbnail_b64 = await loop.run_in_executor(
+                    None,
+                    embedder.embed_image_from_url,
+                    image_url
+                )
+                if image_vector is None:
+                    self.status.text = "Failed to embed image"
+                    return
+                embed_cache.put(image_id, image_vector, thumbnail_b64)
                 
             # Prepare payload
-            import time
             payload = {
                 "prompt": parsed_prompt,
                 "original_prompt": original_prompt,  # Store both prompts
@@ -85,7 +104,5 @@ class ImageRating:
                 self.status.text = "Storage failed ✗"
                 
         except Exception as e:
-            import traceback
-            print(f"Error storing rated image: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error storing rated image")
             self.status.text = f"Error: {str(e)}" 
\ No newline at end of file
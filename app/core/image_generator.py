@@ -22,13 +22,15 @@ Key Features:
 """
 
 import os
-import uuid
-import aiohttp
 from app.utils.config import Config
 from app.utils.logger import Logger
+from app.services.http_client import fetch_bytes
+from app.services.store_images import get_image_store
 from runware import Runware, IImageInference, RunwareAPIError
 import asyncio
+from async_timeout import timeout
 from runware.types import ILora
+import hashlib
 import json
 import time
 from typing import List, Optional, Dict
@@ -50,6 +52,9 @@ class ImageGenerator:
     WARNING: The parallel processing implementation is critical and should not be
     modified as it ensures proper handling of concurrent image generation requests.
     """
+    # Limits in-flight Runware requests across all instances, created with the first one
+    _generation_slots = None
+    
     def __init__(self):
         """
         Initialize the image generator service.
@@ -59,10 +64,15 @@ class ImageGenerator:
         - Logging system
         - Local image storage directory
         - Runware connection (lazy initialization)
+        - Process-wide limit on concurrent generation requests
         """
         self.config = Config()
         self.logger = Logger()
         self.runware = None
+        if ImageGenerator._generation_slots is None:
+            ImageGenerator._generation_slots = asyncio.Semaphore(
+                int(self.config.get("image_generation", "max_concurrency", 4))
+            )
         self.images_dir = os.path.join("data", "images")
         os.makedirs(self.images_dir, exist_ok=True)
 
@@ -110,20 +120,22 @@ class ImageGenerator:
             The generated image result or None if generation failed
         """
         try:
-            # Create a new Runware connection for this request
-            runware = Runware(api_key=self.config.get("image_generation", "runware_api_key"))
-            await runware.connect()
-            
-            try:
-                result = await runware.imageInference(requestImage=request_image)
-                return result
-            except RunwareAPIError as e:
-                self.logger.error(f"API Error for request {request_id}: {e}")
-                self.logger.error(f"Error Code: {e.code if hasattr(e, 'code') else 'unknown'}")
-                return None
-            except Exception as e:
-                self.logger.error(f"Unexpected Error for request {request_id}: {str(e)}")
-                return None
+            # Wait for a free generation slot, shared by every generator in the process
+            async with ImageGenerator._generation_slots:
+                # Create a new Runware connection for this request
+                runware = Runware(api_key=self.config.get("image_generation", "runware_api_key"))
+                await runware.connect()
+                
+                try:
+                    result = await runware.imageInference(requestImage=request_image)
+                    return result
+                except RunwareAPIError as e:
+                    self.logger.error(f"API Error for request {request_id}: {e}")
+                    self.logger.error(f"Error Code: {e.code if hasattr(e, 'code') else 'unknown'}")
+                    return None
+                except Exception as e:
+                    self.logger.error(f"Unexpected Error for request {request_id}: {str(e)}")
+                    return None
                 
         except Exception as e:
             self.logger.error(f"Error creating Runware connection for request {request_id}: {str(e)}")
@@ -277,10 +289,8 @@ class ImageGenerator:
                 tasks = [self._safe_request_image(request_id, request) 
                          for request_id, request in zip(request_ids, requests)]
                 
-                all_results = await asyncio.wait_for(
-                    asyncio.gather(*tasks, return_exceptions=True),
-                    timeout=timeout_seconds
-                )
+                async with timeout(timeout_seconds):
+                    all_results = await asyncio.gather(*tasks, return_exceptions=True)
                 
                 self.logger.info("=== API Results ===")
                 self.logger.info(f"Raw results: {all_results}")
@@ -345,6 +355,41 @@ class ImageGenerator:
             self.logger.error(f"Error in image generation: {str(e)}")
             return []
 
+    def settings_key(self) -> str:
+        """
+        Fingerprint the generation settings that shape an image.
+        
+        Cached images are only valid for the settings they were made with, so
+        the key covers the whole image_generation section (model, LoRA, steps,
+        cfg_scale, scheduler, prompt_pre/prompt_post, sizes, ...) except the
+        API keys and the concurrency limit, which do not change the output.
+        
+        Returns:
+            Hex digest of the relevant configuration
+        """
+        settings = {
+            key: value for key, value in (self.config.get("image_generation") or {}).items()
+            if key not in ("runware_api_key", "stability_api_key", "max_concurrency")
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    async def generate_one(self, prompt: dict | str, negative_prompt: str = None) -> Optional[dict]:
+        """
+        Generate a single image from one scene prompt.
+        
+        Thin wrapper around generate() so callers can schedule one task per
+        scene and handle each result as soon as it finishes.
+        
+        Args:
+            prompt: A string prompt or a parsed scene dict (see generate())
+            negative_prompt: Optional negative prompt to use
+            
+        Returns:
+            Dict with 'url' and 'file_path' keys, or None if generation failed
+        """
+        results = await self.generate([prompt], negative_prompt)
+        return results[0] if results else None
+
     async def _download_and_save_image(self, image_url: str, image_id: str) -> str:
         """
         Download an image from URL and save it to MinIO.
@@ -379,22 +424,17 @@ class ImageGenerator:
             
             self.logger.info(f"Downloading image from {image_url} to {file_path}")
             
-            # Download the image
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_url) as response:
-                    response.raise_for_status()
-                    content = await response.read()
-                    
-                    # Save to file temporarily
-                    with open(file_path, 'wb') as f:
-                        f.write(content)
+            # Download the image through the shared connection pool
+            content = await fetch_bytes(image_url)
+            
+            # Save to file temporarily
+            with open(file_path, 'wb') as f:
+                f.write(content)
                         
             self.logger.info(f"Saved image {image_id} to {file_path}")
             
             # Upload to MinIO
-            from app.services.store_images import StoreImages
-            image_store = StoreImages()
-            minio_url = image_store.upload_image(file_path, object_name=file_name)
+            minio_url = get_image_store().upload_image(file_path, object_name=file_name)
             
             # Clean up local file
             try:
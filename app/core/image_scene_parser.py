@@ -11,6 +11,7 @@ This module implements the image scene parsing system that handles:
 The system provides:
 - LLM-based scene parsing with state context
 - Structured prompt generation
+- Streamed parsing that yields each prompt as soon as it is complete
 - Multiple provider support (OpenRouter, Local)
 - JSON schema validation
 - Error handling and logging
@@ -23,14 +24,15 @@ Key Features:
 - Response parsing and cleanup
 """
 
+import hashlib
 import json
 import re
-import httpx
 import asyncio
 from app.models.prompt_models import PromptManager, PromptType
 from app.utils.config import Config
 from app.utils.logger import Logger
 from app.core.state_manager import StateManager
+from app.services.http_client import get_http_client
 from enum import Enum
 from typing import List, Dict
 
@@ -45,6 +47,59 @@ class LLMProvider(Enum):
     LOCAL = "local"
     OPENROUTER = "openrouter"
 
+class _SceneItemScanner:
+    """
+    Incremental splitter for a streamed scene parser reply.
+    
+    The reply has the shape {"images": [{...}, {...}]}. Every object that
+    opens directly inside the outer object is an image entry; its text is
+    returned as soon as its closing brace has been fed in. Braces inside
+    JSON strings are ignored, and anything around the outer object (such
+    as markdown code fences) is skipped.
+    """
+    
+    def __init__(self):
+        self._depth = 0           # Current brace nesting depth
+        self._in_string = False   # Inside a JSON string literal
+        self._escaped = False     # Previous character was a backslash inside a string
+        self._item = None         # Characters of the image entry being collected
+    
+    def feed(self, text: str) -> List[str]:
+        """
+        Consume the next chunk of the reply.
+        
+        Args:
+            text: Next piece of the streamed reply
+            
+        Returns:
+            List[str]: JSON text of every image entry completed by this chunk
+        """
+        completed = []
+        for char in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+                if self._depth == 2:
+                    self._item = []
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 1 and self._item is not None:
+                    self._item.append(char)
+                    completed.append("".join(self._item))
+                    self._item = None
+                    continue
+            if self._item is not None:
+                self._item.append(char)
+        return completed
+
 class ImageSceneParser:
     """
     Image scene parser that converts text descriptions into structured image prompts.
@@ -65,7 +120,8 @@ class ImageSceneParser:
         Parse text descriptions into structured image generation prompts.
         
         Args:
-            response_text: Text containing image descriptions
+            response_text: Text containing image descriptions, or an already built
+                context dict with an 'images' list (used as is, without a JSON round trip)
             current_appearance: Optional current appearance override
             
         Returns:
@@ -84,151 +140,31 @@ class ImageSceneParser:
         logger.debug(f"Current appearance: {current_appearance}")
 
         try:
-            # Get the full character state from state manager
-            state_manager = StateManager()
-            character_state = state_manager.get_state()
-            
-            logger.info("Character state for image generation:")
-            logger.info(f"  Mood: {character_state.get('mood', 'None')}")
-            logger.info(f"  Appearance: {character_state.get('appearance', 'None')[:50]}...")
-            logger.info(f"  Clothing: {character_state.get('clothing', 'None')[:50]}...")
-            logger.info(f"  Location: {character_state.get('location', 'None')[:50]}...")
-
-            # Get provider configuration
-            config = Config()
-            parser_provider = config.get("llm", "image_parser_provider", "openrouter")
-            parser_model = config.get("llm", "image_parser_model", "mistralai/mistral-small-3.1-24b-instruct")
-
-            logger.info(f"Using image parser: {parser_provider}/{parser_model}")
-
-            # Configure provider-specific settings
-            if parser_provider == "openrouter":
-                api_base = config.get("llm", "openrouter_api_base", "https://openrouter.ai/api/v1")
-                api_key = config.get("llm", "openrouter_api_key", "")
-                if not api_key:
-                    logger.error("No OpenRouter API key found for image parser")
-                    return None
-
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                    "HTTP-Referer": config.get("llm", "http_referer", "http://localhost:8080"),
-                    "X-Title": "Nyx AI Assistant - Image Parser"
-                }
-            else:
-                api_base = config.get("llm", "local_api_base", "http://localhost:5000/v1")
-                headers = {"Content-Type": "application/json"}
-
-            # Construct system prompt with state context
-            prompt_manager = PromptManager()
-            parser_data = prompt_manager.get_prompt("image_scene_parser", PromptType.IMAGE_PARSER.value)
-            system_prompt = parser_data["content"] if parser_data else ImageSceneParser._default_prompt()
+            request = ImageSceneParser._build_request(response_text, logger)
+            if request is None:
+                return None
+            endpoint, payload, headers = request
 
-            # Add character state information to system prompt
-            system_prompt += f"\n\nCURRENT CHARACTER STATE:\nappearance: {character_state.get('appearance', '')}\nmood: {character_state.get('mood', '')}\nclothing: {character_state.get('clothing', '')}\nlocation: {character_state.get('location', '')}\n"
+            # Make API request through the shared connection pool
+            response = await get_http_client().post(endpoint, json=payload, headers=headers, timeout=60.0)
             
-            logger.debug(f"System prompt for image parser:\n{system_prompt}")
-
-            # Handle input data based on its type
-            if isinstance(response_text, str):
-                try:
-                    input_data = json.loads(response_text)
-                except json.JSONDecodeError:
-                    input_data = {"content": response_text}
-            else:
-                input_data = response_text
-
-            # Process image descriptions with context
-            if isinstance(input_data, dict) and "images" in input_data:
-                # Extract sequence information
-                sequences = [img.get("sequence", i+1) for i, img in enumerate(input_data["images"])]
-                image_text = []
-                
-                # Use provided context if available, otherwise fallback to state
-                mood = input_data.get('mood', character_state.get('mood', 'neutral'))
-                appearance = input_data.get('appearance', character_state.get('appearance', ''))
-                clothing = input_data.get('clothing', character_state.get('clothing', ''))
-                location = input_data.get('location', character_state.get('location', ''))
-                
-                # Add all context
-                image_text.append(f"Current mood: {mood}")
-                image_text.append(f"Current appearance: {appearance}")
-                image_text.append(f"Current clothing: {clothing}")
-                image_text.append(f"Current location: {location}")
-                
-                # Add all image descriptions
-                image_text.extend([f"Image {seq}: {img['content']}" for seq, img in zip(sequences, input_data["images"])])
-                image_text = "\n".join(image_text)
+            if response.status_code != 200:
+                error_data = response.json()
+                error_msg = error_data.get("error", {}).get("message", "Unknown error")
+                error_code = error_data.get("error", {}).get("code", response.status_code)
+                logger.error(f"OpenRouter error: {error_msg} (code: {error_code})")
+                logger.error(f"Error details: {error_data}")
+                return None
+            
+            response_data = response.json()
+            
+            # Handle different response formats
+            if "choices" in response_data:
+                parsed_content = response_data["choices"][0]["message"]["content"]
+            elif "message" in response_data:
+                parsed_content = response_data["message"]["content"]
             else:
-                # For free-text input, add context before the content
-                context_prefix = [
-                    f"Current mood: {character_state.get('mood', 'neutral')}",
-                    f"Current appearance: {character_state.get('appearance', '')}",
-                    f"Current clothing: {character_state.get('clothing', '')}",
-                    f"Current location: {character_state.get('location', '')}",
-                    "Image description:"
-                ]
-                image_text = "\n".join(context_prefix) + "\n" + (input_data.get("content", "") if isinstance(input_data, dict) else str(input_data))
-
-            # Prepare messages for LLM
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"{image_text}"}
-            ]
-
-            logger.debug(f"Full messages for image parser:\n{json.dumps(messages, indent=2)}")
-
-            # Configure request payload
-            endpoint = f"{api_base}/chat/completions"
-            payload = {
-                "model": parser_model,
-                "messages": messages,
-                "temperature": 0.2,
-                "max_tokens": 8192,
-                "response_format": {
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "images": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "prompt": {"type": "string"},
-                                        "sequence": {"type": "integer"},
-                                        "orientation": {"type": "string", "enum": ["portrait", "landscape"]}
-                                    },
-                                    "required": ["prompt", "sequence", "orientation"]
-                                }
-                            }
-                        },
-                        "required": ["images"]
-                    }
-                }
-            }
-
-            logger.debug(f"Image parser request to {endpoint}: {json.dumps(payload, indent=2)}")
-
-            # Make API request
-            async with httpx.AsyncClient() as client:
-                response = await client.post(endpoint, json=payload, headers=headers, timeout=60.0)
-                
-                if response.status_code != 200:
-                    error_data = response.json()
-                    error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                    error_code = error_data.get("error", {}).get("code", response.status_code)
-                    logger.error(f"OpenRouter error: {error_msg} (code: {error_code})")
-                    logger.error(f"Error details: {error_data}")
-                    return None
-                
-                response_data = response.json()
-                
-                # Handle different response formats
-                if "choices" in response_data:
-                    parsed_content = response_data["choices"][0]["message"]["content"]
-                elif "message" in response_data:
-                    parsed_content = response_data["message"]["content"]
-                else:
-                    parsed_content = response_data.get("content", str(response_data))
+                parsed_content = response_data.get("content", str(response_data))
             
             logger.debug(f"Raw LLM response: {parsed_content}")
 
@@ -258,11 +194,7 @@ class ImageSceneParser:
                 
                 # Validate each image entry
                 for i, image in enumerate(images):
-                    if not isinstance(image, dict):
-                        logger.error(f"Image {i} is not a dictionary: {image}")
-                        return None
-                    if "prompt" not in image:
-                        logger.error(f"Image {i} missing 'prompt' key: {image}")
+                    if not ImageSceneParser._valid_image(i, image, logger):
                         return None
                 
                 logger.info("Successfully parsed image scenes")
@@ -276,6 +208,261 @@ class ImageSceneParser:
             logger.error(f"Error in image scene parsing: {str(e)}", exc_info=True)
             return None
 
+    @staticmethod
+    async def parse_images_stream(response_text, current_appearance=None):
+        """
+        Parse text descriptions into image prompts, yielding each prompt as soon as it is complete.
+        
+        Args:
+            response_text: Text or context dict, as accepted by parse_images
+            current_appearance: Optional current appearance override
+            
+        Yields:
+            dict: One structured image prompt at a time, in the order the LLM writes them
+            
+        This method:
+        1. Builds the same request as parse_images
+        2. Streams the LLM reply token by token
+        3. Yields every image object once its closing brace arrives
+        4. Skips malformed entries and stops on request errors
+        
+        Callers can start generating the first image while the LLM is
+        still writing the others.
+        """
+        logger = Logger()
+        logger.info("Starting streamed image parsing from Nyx response")
+        logger.debug(f"Current appearance: {current_appearance}")
+
+        try:
+            request = ImageSceneParser._build_request(response_text, logger)
+            if request is None:
+                return
+            endpoint, payload, headers = request
+
+            scanner = _SceneItemScanner()
+            count = 0
+            # Stream through the shared connection pool
+            async with get_http_client().stream('POST', endpoint, json={**payload, "stream": True}, headers=headers, timeout=60.0) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    logger.error(f"Image parser stream error (code: {response.status_code}): {response.text}")
+                    return
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    json_str = line[6:]
+                    if json_str == "[DONE]":
+                        break
+                    try:
+                        delta = json.loads(json_str)["choices"][0].get("delta", {}).get("content", "")
+                    except (json.JSONDecodeError, KeyError, IndexError) as e:
+                        logger.error(f"Error parsing image parser stream chunk: {str(e)}")
+                        continue
+                    
+                    for item in scanner.feed(delta or ""):
+                        # Same cleanup and checks as the entries of a complete reply
+                        try:
+                            image = json.loads(ImageSceneParser._parse_response(item))
+                        except json.JSONDecodeError as e:
+                            logger.error(f"Failed to parse streamed image entry: {str(e)}")
+                            continue
+                        if not ImageSceneParser._valid_image(count, image, logger):
+                            continue
+                        count += 1
+                        yield image
+
+            logger.info(f"Successfully streamed {count} image scenes")
+
+        except Exception as e:
+            logger.error(f"Error in streamed image scene parsing: {str(e)}", exc_info=True)
+
+    @staticmethod
+    def settings_key() -> str:
+        """
+        Fingerprint the parser settings that shape its scenes.
+        
+        Covers the provider, the model and the system prompt (its version
+        and text), so cached scenes are dropped when any of them changes.
+        
+        Returns:
+            Hex digest of the parser configuration
+        """
+        config = Config()
+        parser_data = PromptManager().get_prompt("image_scene_parser", PromptType.IMAGE_PARSER.value)
+        settings = [
+            config.get("llm", "image_parser_provider", "openrouter"),
+            config.get("llm", "image_parser_model", "mistralai/mistral-small-3.1-24b-instruct"),
+            parser_data.get("version") if parser_data else None,
+            parser_data["content"] if parser_data else ImageSceneParser._default_prompt()
+        ]
+        return hashlib.sha256(json.dumps(settings, default=str).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _build_request(response_text, logger):
+        """
+        Build the chat completion request for a scene parsing call.
+        
+        Args:
+            response_text: Text or context dict, as accepted by parse_images
+            logger: Logger for progress and errors
+            
+        Returns:
+            Tuple of (endpoint, payload, headers), or None if no API key is configured
+            
+        This method:
+        1. Retrieves current character state
+        2. Resolves the provider, model and headers
+        3. Constructs the system prompt with state context
+        4. Formats the image descriptions as the user message
+        """
+        # Get the full character state from state manager
+        state_manager = StateManager()
+        character_state = state_manager.get_state()
+        
+        logger.info("Character state for image generation:")
+        logger.info(f"  Mood: {character_state.get('mood', 'None')}")
+        logger.info(f"  Appearance: {character_state.get('appearance', 'None')[:50]}...")
+        logger.info(f"  Clothing: {character_state.get('clothing', 'None')[:50]}...")
+        logger.info(f"  Location: {character_state.get('location', 'None')[:50]}...")
+
+        # Get provider configuration
+        config = Config()
+        parser_provider = config.get("llm", "image_parser_provider", "openrouter")
+        parser_model = config.get("llm", "image_parser_model", "mistralai/mistral-small-3.1-24b-instruct")
+
+        logger.info(f"Using image parser: {parser_provider}/{parser_model}")
+
+        # Configure provider-specific settings
+        if parser_provider == "openrouter":
+            api_base = config.get("llm", "openrouter_api_base", "https://openrouter.ai/api/v1")
+            api_key = config.get("llm", "openrouter_api_key", "")
+            if not api_key:
+                logger.error("No OpenRouter API key found for image parser")
+                return None
+
+            headers = {
+                "Authorization": f"Bearer {api_key}",
+                "HTTP-Referer": config.get("llm", "http_referer", "http://localhost:8080"),
+                "X-Title": "Nyx AI Assistant - Image Parser"
+            }
+        else:
+            api_base = config.get("llm", "local_api_base", "http://localhost:5000/v1")
+            headers = {"Content-Type": "application/json"}
+
+        # Construct system prompt with state context
+        prompt_manager = PromptManager()
+        parser_data = prompt_manager.get_prompt("image_scene_parser", PromptType.IMAGE_PARSER.value)
+        system_prompt = parser_data["content"] if parser_data else ImageSceneParser._default_prompt()
+
+        # Add character state information to system prompt
+        system_prompt += f"\n\nCURRENT CHARACTER STATE:\nappearance: {character_state.get('appearance', '')}\nmood: {character_state.get('mood', '')}\nclothing: {character_state.get('clothing', '')}\nlocation: {character_state.get('location', '')}\n"
+        
+        logger.debug(f"System prompt for image parser:\n{system_prompt}")
+
+        # Handle input data based on its type
+        if isinstance(response_text, str):
+            try:
+                input_data = json.loads(response_text)
+            except json.JSONDecodeError:
+                input_data = {"content": response_text}
+        else:
+            input_data = response_text
+
+        # Process image descriptions with context
+        if isinstance(input_data, dict) and "images" in input_data:
+            # Extract sequence information
+            sequences = [img.get("sequence", i+1) for i, img in enumerate(input_data["images"])]
+            image_text = []
+            
+            # Use provided context if available, otherwise fallback to state
+            mood = input_data.get('mood', character_state.get('mood', 'neutral'))
+            appearance = input_data.get('appearance', character_state.get('appearance', ''))
+            clothing = input_data.get('clothing', character_state.get('clothing', ''))
+            location = input_data.get('location', character_state.get('location', ''))
+            
+            # Add all context
+            image_text.append(f"Current mood: {mood}")
+            image_text.append(f"Current appearance: {appearance}")
+            image_text.append(f"Current clothing: {clothing}")
+            image_text.append(f"Current location: {location}")
+            
+            # Add all image descriptions
+            image_text.extend([f"Image {seq}: {img['content']}" for seq, img in zip(sequences, input_data["images"])])
+            image_text = "\n".join(image_text)
+        else:
+            # For free-text input, add context before the content
+            context_prefix = [
+                f"Current mood: {character_state.get('mood', 'neutral')}",
+                f"Current appearance: {character_state.get('appearance', '')}",
+                f"Current clothing: {character_state.get('clothing', '')}",
+                f"Current location: {character_state.get('location', '')}",
+                "Image description:"
+            ]
+            image_text = "\n".join(context_prefix) + "\n" + (input_data.get("content", "") if isinstance(input_data, dict) else str(input_data))
+
+        # Prepare messages for LLM
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"{image_text}"}
+        ]
+
+        logger.debug(f"Full messages for image parser:\n{json.dumps(messages, indent=2)}")
+
+        # Configure request payload
+        endpoint = f"{api_base}/chat/completions"
+        payload = {
+            "model": parser_model,
+            "messages": messages,
+            "temperature": 0.2,
+            "max_tokens": 8192,
+            "response_format": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "images": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "prompt": {"type": "string"},
+                                    "sequence": {"type": "integer"},
+                                    "orientation": {"type": "string", "enum": ["portrait", "landscape"]}
+                                },
+                                "required": ["prompt", "sequence", "orientation"]
+                            }
+                        }
+                    },
+                    "required": ["images"]
+                }
+            }
+        }
+
+        logger.debug(f"Image parser request to {endpoint}: {json.dumps(payload, indent=2)}")
+
+        return endpoint, payload, headers
+
+    @staticmethod
+    def _valid_image(index: int, image, logger) -> bool:
+        """
+        Check that a parsed image entry has the expected shape.
+        
+        Args:
+            index: Position of the entry in the reply, for the log message
+            image: Parsed entry
+            logger: Logger for validation errors
+            
+        Returns:
+            bool: True if the entry is a dictionary with a prompt
+        """
+        if not isinstance(image, dict):
+            logger.error(f"Image {index} is not a dictionary: {image}")
+            return False
+        if "prompt" not in image:
+            logger.error(f"Image {index} missing 'prompt' key: {image}")
+            return False
+        return True
+
     @staticmethod
     def _default_prompt() -> str:
         """
@@ -12,11 +12,12 @@ It handles:
 The service provides a consistent interface for the rest of the application to interact with the language model.
 """
 
-import httpx
 import json
 import time
 from app.utils.config import Config
 from app.utils.logger import Logger
+from app.core.prompt_builder import PromptBuilder
+from app.services.http_client import get_http_client
 
 class LLMIntegration:
     """
@@ -143,20 +144,96 @@ class LLMIntegration:
         if self.use_streaming:
             response = await self._handle_streaming_response(endpoint, {**payload, "stream": True}, headers)
         else:
-            async with httpx.AsyncClient() as client:
-                api_response = await client.post(endpoint, json=payload, headers=headers, timeout=self.timeout)
-                api_response.raise_for_status()
-                
-                # Log raw API response
-                self.logger.debug(f"OpenRouter response: {api_response.text}")
-                
-                response = api_response.json()["choices"][0]["message"]["content"].strip()
+            api_response = await get_http_client().post(endpoint, json=payload, headers=headers, timeout=self.timeout)
+            api_response.raise_for_status()
+            
+            # Log raw API response
+            self.logger.debug(f"OpenRouter response: {api_response.text}")
+            
+            response = api_response.json()["choices"][0]["message"]["content"].strip()
         
         end_time = time.time()
         self.logger.info(f"OpenRouter request completed in {end_time - start_time:.2f} seconds")
         
         return response
 
+    async def stream_response(self, user_message, conversation_history=None, current_mood=None,
+                              current_appearance=None, world_state=None, relevant_memories=None,
+                              relationships=None, model=None):
+        """
+        Stream a response from the OpenRouter LLM token by token.
+        
+        This is the streaming counterpart of generate_response. It:
+        1. Builds the system prompt from the current context
+        2. Opens a streaming request to OpenRouter
+        3. Yields each content delta as soon as it arrives
+        4. Logs the complete conversation once the stream ends
+        """
+        if conversation_history is None:
+            conversation_history = []
+            
+        model = model or self.default_model
+        
+        system_prompt = PromptBuilder.build_system_message(
+            relevant_memories=relevant_memories,
+            current_mood=current_mood,
+            current_appearance=current_appearance,
+            world_state=world_state,
+            relationships=relationships
+        )
+        
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(conversation_history[-self.max_messages:])
+        messages.append({"role": "user", "content": user_message})
+
+        payload = {**self._build_payload(messages=messages, model=model), "stream": True}
+        endpoint = f"{self._get_api_base()}/chat/completions"
+        
+        self.logger.debug(f"OpenRouter streaming request to {endpoint}")
+
+        start_time = time.time()
+        reply = ""
+        async for content in self._stream_chunks(endpoint, payload, self._get_headers()):
+            reply += content
+            yield content
+        
+        self.logger.info(f"OpenRouter stream completed in {time.time() - start_time:.2f} seconds")
+        
+        self.logger.log_conversation(
+            system_prompt=system_prompt,
+            user_message=user_message,
+            conversation_history=conversation_history,
+            llm_response=reply,
+            provider="openrouter",
+            model=model
+        )
+
+    async def _stream_chunks(self, endpoint, payload, headers):
+        """
+        Yield content deltas from an OpenRouter streaming response.
+        
+        This method:
+        1. Establishes a streaming connection to the API
+        2. Parses each server-sent event line
+        3. Yields non-empty content deltas as they arrive
+        """
+        async with get_http_client().stream('POST', endpoint, json=payload, headers=headers, timeout=self.timeout) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    if line.startswith("data: "):
+                        json_str = line[6:]
+                        if json_str == "[DONE]":
+                            break
+                        chunk = json.loads(json_str)
+                        content = chunk["choices"][0].get("delta", {}).get("content", "")
+                        if content:
+                            yield content
+                except Exception as e:
+                    self.logger.warning(f"Error parsing stream chunk: {e}")
+
     async def _handle_streaming_response(self, endpoint, payload, headers):
         """
         Handle streaming responses from OpenRouter.
@@ -168,22 +245,8 @@ class LLMIntegration:
         4. Manages connection errors and timeouts
         """
         reply = ""
-        async with httpx.AsyncClient() as client:
-            async with client.stream('POST', endpoint, json=payload, headers=headers, timeout=self.timeout) as response:
-                response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if not line.strip():
-                        continue
-                    try:
-                        if line.startswith("data: "):
-                            json_str = line[6:]
-                            if json_str == "[DONE]":
-                                break
-                            chunk = json.loads(json_str)
-                            content = chunk["choices"][0].get("delta", {}).get("content", "")
-                            reply += content
-                    except Exception as e:
-                        print(f"Error parsing stream chunk: {e}")
+        async for content in self._stream_chunks(endpoint, payload, headers):
+            reply += content
         return reply
 
     def _handle_error(self, e):
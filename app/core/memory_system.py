@@ -28,6 +28,24 @@ import time
 import sqlite3
 import numpy as np
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Single background thread for conversation writes, so SQLite commits never block the UI loop
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-writer")
+_writer_db = None  # Database connection owned by the writer thread
+
+def _insert_conversation_entries(entries):
+    """Insert (role, content) pairs in one transaction; runs on the writer thread."""
+    global _writer_db
+    if _writer_db is None:
+        # SQLite connections are bound to the thread that opened them
+        _writer_db = Database()
+    conn = _writer_db.get_connection()
+    conn.executemany(
+        "INSERT INTO conversations (role, content, embedding) VALUES (?, ?, ?)",
+        [(role, content, None) for role, content in entries]
+    )
+    conn.commit()
 
 class MemorySystem:
     """
@@ -72,6 +90,18 @@ class MemorySystem:
         conn.commit()
         return cursor.lastrowid
     
+    async def add_conversation_entries(self, entries):
+        """
+        Add several conversation turns in a single transaction.
+        
+        This method stores a user/assistant exchange (or any list of
+        (role, content) pairs) with one executemany and one commit,
+        preserving the order of the entries. The insert runs on the
+        background writer thread so the caller's event loop keeps going.
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(_write_executor, _insert_conversation_entries, list(entries))
+    
     def get_recent_conversation(self, limit=20):
         """
         Retrieve recent conversation history.
@@ -121,6 +151,36 @@ class MemorySystem:
         except Exception as e:
             print(f"Failed to store thought: {e}")
     
+    async def add_thoughts(self, contents, intensity=0.5):
+        """
+        Store several thoughts from one response.
+        
+        This method:
+        1. Saves only the last thought as the current thought in state manager
+        2. Embeds every thought in the default executor, off the event loop
+        3. Stores every thought in Qdrant for semantic search
+        """
+        if not contents:
+            return
+        self.state_manager.update_current_thought(contents[-1])
+        
+        mood = self.get_current_mood()
+        loop = asyncio.get_event_loop()
+        # Resolve the per-thought calls once instead of on every iteration
+        run_in_executor = loop.run_in_executor
+        embed_prompt = self.embedder.embed_prompt
+        store_memory = self.qdrant_memory.store_memory
+        for content in contents:
+            vector = await run_in_executor(None, embed_prompt, content)
+            await store_memory(
+                text=content,
+                vector=vector,
+                memory_type="thought",
+                tags=["thought"],
+                mood=mood,
+                intensity=intensity
+            )
+    
     def add_secret(self, content, intensity=0.5, embedding=None):
         """
         Store a secret with intensity level.
@@ -313,6 +373,15 @@ class MemorySystem:
         """
         return self.state_manager.add_clothing(description)
 
+    def apply_updates(self, updates):
+        """
+        Apply a turn's mood, appearance and clothing changes in one state save.
+        
+        This method delegates to the state manager so all state tags of a
+        response are persisted together instead of once per kind.
+        """
+        return self.state_manager.apply_updates(updates)
+
     def add_clothing_change(self, change: str):
         """
         Add a clothing change.
@@ -26,15 +26,37 @@ Key Features:
 import json
 import re
 import os
+from collections import Counter
 from app.models.prompt_models import PromptManager, PromptType
 from app.utils.config import Config
 from app.utils.logger import Logger
 from app.core.state_manager import StateManager
+from app.services.http_client import get_http_client
 from enum import Enum
-import httpx
 import jsonschema
 from pathlib import Path
 
+# Tags extracted by the regex parser, each accepted as <tag>...</tag> or [[tag]]...[[/tag]]
+_PARSED_TAGS = ("thought", "mood", "appearance", "clothing", "location", "image")
+_PARSED_TAG_RE = re.compile(
+    "|".join(
+        rf"(?:<{tag}>|\[\[{tag}\]\])(?P<{tag}>.*?)(?:</{tag}>|\[\[/{tag}\]\])"
+        for tag in _PARSED_TAGS
+    ),
+    re.DOTALL
+)
+
+# Any opening tag that starts with a letter and contains letters, numbers, or hyphens
+_OPEN_TAG_RE = re.compile(r'<([a-z][a-z0-9-]*)>')
+_CLOSE_TAG_RE = re.compile(r'</([a-z][a-z0-9-]*)>')
+
+# Opening tag made of letters only, which ends the content of an unclosed tag
+_LETTER_TAG_RE = re.compile(r'<[a-z]+>')
+
+# JSON repairs: a missing comma after a property value, and an unquoted property name
+_MISSING_COMMA_RE = re.compile(r'("[^"]*"\s*:\s*(?:"[^"]*"|\d+|true|false|null))\s*(?="[^"]*"|})')
+_UNQUOTED_KEY_RE = re.compile(r'([{,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)(\s*:\s*)')
+
 class LLMProvider(Enum):
     """
     Supported LLM providers for response parsing.
@@ -72,56 +94,94 @@ class ResponseParser:
             str: The text with all unclosed tags properly closed
             
         This method:
-        1. Finds all unique tags in the text
+        1. Counts opening and closing tags of every kind
         2. Checks for unclosed tags
-        3. Closes tags at appropriate boundaries
+        3. Closes tags at appropriate boundaries in a single left-to-right pass
         4. Handles nested and overlapping tags
+        
+        The output is assembled from slices of the input, so the cost stays
+        linear in the text length no matter how many tags need closing.
         """
-        # First, find all unique tags in the text
-        # This pattern matches any opening tag that starts with a letter and contains letters, numbers, or hyphens
-        tag_pattern = r'<([a-z][a-z0-9-]*)>'
-        tags = set(re.findall(tag_pattern, text))
+        # First, count opening and closing tags of every kind in one scan each
+        opening_tags = Counter(_OPEN_TAG_RE.findall(text))
+        closing_tags = Counter(_CLOSE_TAG_RE.findall(text))
         
         logger = Logger()
-        logger.debug(f"Found tags to process: {tags}")
+        logger.debug(f"Found tags to process: {set(opening_tags)}")
+        
+        # Only tag types with more openings than closings need work
+        unclosed = {tag for tag, count in opening_tags.items() if count > closing_tags[tag]}
+        if not unclosed:
+            return text
         
-        # Process each tag type
-        for tag in tags:
-            # First check if there are any unclosed tags by counting opening and closing tags
-            opening_tags = len(re.findall(f'<{tag}>', text))
-            closing_tags = len(re.findall(f'</{tag}>', text))
+        # An opening tag only needs closing if no closing tag follows it anywhere later
+        last_closing = {tag: text.rfind(f'</{tag}>') for tag in unclosed}
+        
+        # Walk the opening tags left to right, collecting output pieces instead of splicing
+        pieces = []
+        copied_to = 0
+        resume_at = {}
+        for match in _OPEN_TAG_RE.finditer(text):
+            tag = match.group(1)
+            if tag not in unclosed or match.start() < resume_at.get(tag, 0):
+                continue
             
-            if opening_tags <= closing_tags:
-                # All tags are properly closed, skip this tag type
+            # The tag's content runs until a newline, new opening tag, period, or end of text
+            end = ResponseParser._find_tag_end(text, match.end())
+            resume_at[tag] = end
+            if last_closing[tag] >= end:
+                # Tag is closed later, leave this one as is
                 continue
-                
-            # Pattern to find unclosed tags - matches opening tag not followed by closing tag
-            # until a newline, new opening tag, period, or end of text
-            pattern = f'<{tag}>(.*?)(?=<[a-z]+>|[.]|[\n]|$)'
             
-            # Find all matches (there could be multiple unclosed tags)
-            index_shift = 0
-            for match in re.finditer(pattern, text, flags=re.DOTALL):
-                start_idx = match.start() + index_shift
-                end_idx = match.end() + index_shift
-                content = match.group(1)
-                
-                # Check if this tag is actually closed later in the text
-                remaining_text = text[end_idx:]
-                if f'</{tag}>' in remaining_text:
-                    # Tag is closed later, skip this one
-                    continue
-                
-                # Close the tag properly by inserting the closing tag
-                closing_tag = f'</{tag}>'
-                text = text[:end_idx] + closing_tag + text[end_idx:]
-                
-                # Update the index shift for subsequent matches
-                index_shift += len(closing_tag)
-                
-                logger.debug(f"Closed unclosed <{tag}> tag at position {start_idx}")
+            pieces.append(text[copied_to:end])
+            pieces.append(f'</{tag}>')
+            copied_to = end
+            logger.debug(f"Closed unclosed <{tag}> tag at position {match.start()}")
+        
+        pieces.append(text[copied_to:])
+        return ''.join(pieces)
+    
+    @staticmethod
+    def _find_tag_end(text: str, start: int) -> int:
+        """
+        Find where the content of an unclosed tag ends.
+        
+        Args:
+            text: The text being scanned
+            start: Position right after the opening tag
+            
+        Returns:
+            int: Position of the first newline, period or letters-only opening tag
+            at or after start, or the end of the text
+        """
+        end = len(text)
+        for stop in ('.', '\n'):
+            position = text.find(stop, start, end)
+            if position != -1:
+                end = position
         
-        return text
+        position = text.find('<', start, end)
+        while position != -1:
+            if _LETTER_TAG_RE.match(text, position):
+                return position
+            position = text.find('<', position + 1, end)
+        return end
+
+    @staticmethod
+    def _collect_nested_tags(text: str, tags: dict) -> None:
+        """
+        Add the tags found inside a tag body to the collected tags.
+        
+        Args:
+            text: Body of an already extracted tag
+            tags: Tag name to list of bodies, extended in document order
+        """
+        if '<' not in text and '[[' not in text:
+            return
+        for match in _PARSED_TAG_RE.finditer(text):
+            body = match.group(match.lastgroup)
+            tags[match.lastgroup].append(body.strip())
+            ResponseParser._collect_nested_tags(body, tags)
 
     @staticmethod
     def parse_response(response_text, current_appearance=None):
@@ -143,6 +203,7 @@ class ResponseParser:
             - appearance: List of appearance changes
             - clothing: List of clothing changes
             - location: Current location
+            - images: List of image descriptions
         """
         logger = Logger()
         logger.warning("DEPRECATED: Using regex-based parse_response. Please use _llm_parse instead.")
@@ -155,51 +216,49 @@ class ResponseParser:
             "mood": None,
             "appearance": [],
             "clothing": [],
-            "location": None
+            "location": None,
+            "images": []
         }
         
-        # Extract thoughts using regex - handle both formats
-        thought_pattern = r'(?:<thought>|\[\[thought\]\])(.*?)(?:</thought>|\[\[/thought\]\])'
-        thoughts = re.findall(thought_pattern, response_text, re.DOTALL)
-        if thoughts:
-            result["thoughts"] = [thought.strip() for thought in thoughts]
-            logger.info(f"Found {len(thoughts)} thoughts")
-        
-        # Extract mood using regex - handle both formats
-        mood_pattern = r'(?:<mood>|\[\[mood\]\])(.*?)(?:</mood>|\[\[/mood\]\])'
-        moods = re.findall(mood_pattern, response_text, re.DOTALL)
-        if moods:
-            result["mood"] = moods[-1].strip()  # Use the last mood tag if multiple exist
+        # Extract every top-level tag in a single pass over the text - handle both formats
+        tags = {tag: [] for tag in _PARSED_TAGS}
+        text_parts = []
+        last_end = 0
+        for match in _PARSED_TAG_RE.finditer(response_text):
+            body = match.group(match.lastgroup)
+            tags[match.lastgroup].append(body.strip())
+            # Tags nested in this one (e.g. a mood inside a thought) are skipped by the pass above
+            ResponseParser._collect_nested_tags(body, tags)
+            text_parts.append(response_text[last_end:match.start()])
+            last_end = match.end()
+        text_parts.append(response_text[last_end:])
+        
+        if tags["thought"]:
+            result["thoughts"] = tags["thought"]
+            logger.info(f"Found {len(tags['thought'])} thoughts")
+        
+        if tags["mood"]:
+            result["mood"] = tags["mood"][-1]  # Use the last mood tag if multiple exist
             logger.info(f"Found mood update: {result['mood']}")
         
-        # Extract appearance changes using regex - handle both formats
-        appearance_pattern = r'(?:<appearance>|\[\[appearance\]\])(.*?)(?:</appearance>|\[\[/appearance\]\])'
-        appearance_changes = re.findall(appearance_pattern, response_text, re.DOTALL)
-        if appearance_changes:
-            result["appearance"] = [change.strip() for change in appearance_changes]
-            logger.info(f"Found {len(appearance_changes)} appearance changes")
-        
-        # Extract clothing changes using regex - handle both formats
-        clothing_pattern = r'(?:<clothing>|\[\[clothing\]\])(.*?)(?:</clothing>|\[\[/clothing\]\])'
-        clothing_changes = re.findall(clothing_pattern, response_text, re.DOTALL)
-        if clothing_changes:
-            result["clothing"] = [change.strip() for change in clothing_changes]
-            logger.info(f"Found {len(clothing_changes)} clothing changes")
-        
-        # Extract location changes using regex - handle both formats
-        location_pattern = r'(?:<location>|\[\[location\]\])(.*?)(?:</location>|\[\[/location\]\])'
-        locations = re.findall(location_pattern, response_text, re.DOTALL)
-        if locations:
-            result["location"] = locations[-1].strip()  # Use the last location tag if multiple exist
+        if tags["appearance"]:
+            result["appearance"] = tags["appearance"]
+            logger.info(f"Found {len(tags['appearance'])} appearance changes")
+        
+        if tags["clothing"]:
+            result["clothing"] = tags["clothing"]
+            logger.info(f"Found {len(tags['clothing'])} clothing changes")
+        
+        if tags["location"]:
+            result["location"] = tags["location"][-1]  # Use the last location tag if multiple exist
             logger.info(f"Found location update: {result['location']}")
         
-        # Clean the main text by removing all tags - handle both formats
-        result["main_text"] = re.sub(
-            r'(?:<(thought|mood|appearance|clothing|location)>|\[\[\1\]\])(.*?)(?:</\1>|\[\[/\1\]\])',
-            '',
-            response_text,
-            flags=re.DOTALL
-        ).strip()
+        if tags["image"]:
+            result["images"] = tags["image"]
+            logger.info(f"Found {len(tags['image'])} image descriptions")
+        
+        # The main text is everything outside the extracted tags
+        result["main_text"] = "".join(text_parts).strip()
         
         logger.info(f"Parsing complete. Found: {len(result['thoughts'])} thoughts, Mood update: {'Yes' if result['mood'] else 'No'}")
         return result
@@ -248,11 +307,11 @@ class ResponseParser:
         
         # Fix missing commas between properties
         # Only fix if there's no comma and the next character is a quote
-        response = re.sub(r'("[^"]*"\s*:\s*(?:"[^"]*"|\d+|true|false|null))\s*(?="[^"]*"|})', r'\1,', response)
+        response = _MISSING_COMMA_RE.sub(r'\1,', response)
         
         # Fix missing quotes around property names
         # Only fix if the property name isn't already quoted
-        response = re.sub(r'([{,]\s*)([a-zA-Z_][a-zA-Z0-9_]*)(\s*:\s*)', r'\1"\2"\3', response)
+        response = _UNQUOTED_KEY_RE.sub(r'\1"\2"\3', response)
         
         return response
 
@@ -342,26 +401,25 @@ class ResponseParser:
             logger.debug(f"Response parser request to {endpoint}: {json.dumps(payload, indent=2)}")
             
             # Make API request
-            async with httpx.AsyncClient() as client:
-                response = await client.post(endpoint, json=payload, headers=headers, timeout=60.0)
-                
-                if response.status_code != 200:
-                    error_data = response.json()
-                    error_msg = error_data.get("error", {}).get("message", "Unknown error")
-                    error_code = error_data.get("error", {}).get("code", response.status_code)
-                    logger.error(f"OpenRouter error: {error_msg} (code: {error_code})")
-                    logger.error(f"Error details: {error_data}")
-                    return None
-                
-                response_data = response.json()
-                
-                # Handle different response formats
-                if "choices" in response_data:
-                    parsed_content = response_data["choices"][0]["message"]["content"]
-                elif "message" in response_data:
-                    parsed_content = response_data["message"]["content"]
-                else:
-                    parsed_content = response_data.get("content", str(response_data))
+            response = await get_http_client().post(endpoint, json=payload, headers=headers, timeout=60.0)
+            
+            if response.status_code != 200:
+                error_data = response.json()
+                error_msg = error_data.get("error", {}).get("message", "Unknown error")
+                error_code = error_data.get("error", {}).get("code", response.status_code)
+                logger.error(f"OpenRouter error: {error_msg} (code: {error_code})")
+                logger.error(f"Error details: {error_data}")
+                return None
+            
+            response_data = response.json()
+            
+            # Handle different response formats
+            if "choices" in response_data:
+                parsed_content = response_data["choices"][0]["message"]["content"]
+            elif "message" in response_data:
+                parsed_content = response_data["message"]["content"]
+            else:
+                parsed_content = response_data.get("content", str(response_data))
             
             logger.debug(f"Raw LLM response: {parsed_content}")
             
@@ -44,6 +44,12 @@ class StateManager:
     """
     _instance = None
     
+    # Update kind -> (history list key, current value key) in the state object
+    _HISTORY_KEYS = {
+        "appearance": ("appearances", "appearance"),
+        "clothing": ("clothing_history", "clothing")
+    }
+    
     def __new__(cls):
         """
         Singleton pattern implementation.
@@ -304,6 +310,40 @@ class StateManager:
         self._state["clothing"] = description
         self._save_to_db()
     
+    def apply_updates(self, updates):
+        """
+        Apply a turn's worth of state changes with a single save.
+        
+        Args:
+            updates: Dict mapping 'mood', 'appearance' and 'clothing' to
+                lists of new values in order, last one is current
+            
+        This method:
+        1. Sets the mood to the last mood given
+        2. Extends the appearance and clothing histories
+        3. Persists changes once, and only if anything changed
+        """
+        changed = False
+        moods = updates.get("mood")
+        if moods:
+            self._state["mood"] = moods[-1]
+            changed = True
+        for kind, (history_key, current_key) in self._HISTORY_KEYS.items():
+            descriptions = updates.get(kind)
+            if descriptions:
+                self._extend_history(history_key, current_key, descriptions)
+                changed = True
+        if changed:
+            self._save_to_db()
+            self.logger.info(f"State updated: {[kind for kind, values in updates.items() if values]}")
+    
+    def _extend_history(self, history_key, current_key, descriptions):
+        """Append descriptions to a history list and make the last one current, without saving."""
+        history = self._state.get(history_key, [])
+        history.extend(descriptions)
+        self._state[history_key] = history
+        self._state[current_key] = descriptions[-1]
+    
     def get_recent_locations(self, limit=1):
         """
         Get recent location descriptions.
@@ -37,6 +37,7 @@ from .services.chat_pipeline import ChatPipeline
 # Import Qdrant initialization
 from .utils.qdrant_init import initialize_qdrant
 from .services.embedder import get_embedder
+from .services.http_client import close_http_client
 
 # Initialize database
 db = Database()
@@ -167,6 +168,7 @@ def handle_shutdown():
     db.close()
 
 app.on_shutdown(handle_shutdown)
+app.on_shutdown(close_http_client)
 
 # Setup custom error handling for background tasks
 @app.exception_handler(Exception)
@@ -202,7 +204,9 @@ if __name__ in {"__main__", "__mp_main__"}:
         title=appName, 
         port=appPort, 
         favicon='🚀',
-        reconnect_timeout=120  # Increase reconnect timeout to 120 seconds
+        reconnect_timeout=120,  # Increase reconnect timeout to 120 seconds
+        ws_ping_interval=10,    # Keep idle websockets alive with protocol pings instead of UI updates
+        ws_ping_timeout=20
     )
 
     # For prod
@@ -211,7 +215,9 @@ if __name__ in {"__main__", "__mp_main__"}:
     #    title=appName, 
     #    port=appPort, 
     #    favicon='🚀',
-    #    reconnect_timeout=120  # Increase reconnect timeout to 120 seconds
+    #    reconnect_timeout=120,  # Increase reconnect timeout to 120 seconds
+    #    ws_ping_interval=10,    # Keep idle websockets alive with protocol pings instead of UI updates
+    #    ws_ping_timeout=20
     #)
 
     # For native
@@ -223,11 +229,15 @@ if __name__ in {"__main__", "__mp_main__"}:
     #    reload=False, 
     #    native=True, 
     #    window_size=(1600,900),
-    #    reconnect_timeout=120  # Increase reconnect timeout to 120 seconds
+    #    reconnect_timeout=120,  # Increase reconnect timeout to 120 seconds
+    #    ws_ping_interval=10,    # Keep idle websockets alive with protocol pings instead of UI updates
+    #    ws_ping_timeout=20
     #)
 
     # For Docker
     #ui.run(
     #    storage_secret=os.environ['STORAGE_SECRET'],
-    #    reconnect_timeout=120  # Increase reconnect timeout to 120 seconds
+    #    reconnect_timeout=120,  # Increase reconnect timeout to 120 seconds
+    #    ws_ping_interval=10,    # Keep idle websockets alive with protocol pings instead of UI updates
+    #    ws_ping_timeout=20
     #)
\ No newline at end of file
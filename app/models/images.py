@@ -0,0 +1,37 @@
+"""Per-message image records shared by the chat and controls components."""
+
+from dataclasses import dataclass, field
+
+@dataclass(slots=True)
+class ImageEntry:
+    """One image in the Lightbox gallery with the prompts that produced it."""
+    url: str
+    id: str
+    original_prompt: str = ""
+    parsed_prompt: str = ""
+
+@dataclass(slots=True)
+class MessageImages:
+    """
+    The generated images of one chat message, stored column by column.
+    
+    Each list holds one field for every image, all in display order.
+    """
+    urls: list = field(default_factory=list)
+    ids: list = field(default_factory=list)
+    descriptions: list = field(default_factory=list)
+    original_prompts: list = field(default_factory=list)
+    parsed_prompts: list = field(default_factory=list)
+    frame_texts: list = field(default_factory=list)
+    
+    def append(self, url, image_id, description, original_prompt, parsed_prompt, frame_text=None):
+        """Add one image to every column."""
+        self.urls.append(url)
+        self.ids.append(image_id)
+        self.descriptions.append(description)
+        self.original_prompts.append(original_prompt)
+        self.parsed_prompts.append(parsed_prompt)
+        self.frame_texts.append(frame_text)
+    
+    def __len__(self):
+        return len(self.urls)
@@ -29,6 +29,7 @@ from app.utils.logger import Logger
 from app.services.embedder import get_embedder
 from app.services.qdrant_memory_store import QdrantMemoryStore
 from app.services.store_images import StoreImages
+from app.services.llm_cache import get_llm_cache
 import time
 import json
 import asyncio
@@ -102,6 +103,11 @@ class ChatPipeline:
         self.embedder = get_embedder()               # Text embedding service
         self.qdrant_memory = QdrantMemoryStore() # Vector memory storage
         self.image_store = StoreImages()          # Image storage service
+        self.response_parser = ResponseParser()   # Parses the final streamed response
+        self.llm_cache = get_llm_cache()          # Reuses responses to identical requests
+        # Sampled replies differ on every call, so only cache deterministic ones unless configured
+        self.cache_responses = self.config.get("llm", "cache_responses",
+                                               self.config.get("llm", "temperature", 0.8) == 0)
     
     async def process_message(self, user_message):
         """
@@ -124,7 +130,7 @@ class ChatPipeline:
             current_mood = self.memory_system.get_current_mood()
             current_appearance = self.memory_system.get_recent_appearances(1)
             world_state = self.world_manager.get_current_state()
-            relevant_memories = self.memory_system.get_relevant_memories(user_message)
+            relevant_memories = await self.memory_system.get_relevant_memories(user_message)
             relationships = self.memory_system.get_relationship_parameters()
         except Exception as e:
             self.logger.error(f"Error getting context: {str(e)}")
@@ -133,25 +139,46 @@ class ChatPipeline:
 
         # Create response session
         session = ResponseSession(user_message)
+        
+        prompt_context = {
+            "conversation_history": conversation_history,
+            "current_mood": current_mood,
+            "current_appearance": current_appearance[-1] if current_appearance else None,
+            "world_state": world_state,
+            "relevant_memories": relevant_memories,
+            "relationships": relationships
+        }
+        
+        # The key covers everything the prompt is built from, so a hit means the
+        # model would be asked exactly the same thing again
+        cache_key = None
+        cached_response = None
+        if self.cache_responses:
+            cache_key = self.llm_cache.cache_key(self.llm.default_model, user_message, prompt_context)
+            cached_response = self.llm_cache.get(cache_key)
 
-        try:
-            # Stream the response
-            async for token in self.llm.stream_response(
-                user_message=user_message,
-                conversation_history=conversation_history,
-                current_mood=current_mood,
-                current_appearance=current_appearance[0]["description"] if current_appearance else None,
-                world_state=world_state,
-                relevant_memories=relevant_memories,
-                relationships=relationships
-            ):
-                session.append_token(token)
-                yield {"type": "stream", "token": token}
+        if cached_response is not None:
+            self.logger.info(f"LLM cache hit ({self.llm_cache.hits} hits, {self.llm_cache.misses} misses)")
+            session.append_token(cached_response)
+            yield {"type": "stream", "token": cached_response}
+        else:
+            try:
+                # Stream the response
+                async for token in self.llm.stream_response(
+                    user_message=user_message,
+                    **prompt_context
+                ):
+                    session.append_token(token)
+                    yield {"type": "stream", "token": token}
 
-        except Exception as e:
-            self.logger.error(f"Error in streaming response: {str(e)}")
-            yield {"type": "error", "message": str(e)}
-            return
+            except Exception as e:
+                self.logger.error(f"Error in streaming response: {str(e)}")
+                yield {"type": "error", "message": str(e)}
+                return
+            
+            # Only complete responses are worth replaying
+            if cache_key is not None and session.raw_response:
+                self.llm_cache.set(cache_key, session.raw_response)
 
         # Final parsing and post-processing
         try:
@@ -166,7 +193,9 @@ class ChatPipeline:
                 "parsed_text": parsed["main_text"],
                 "mood": parsed.get("mood"),
                 "tags": parsed.get("tags", []),
-                "thoughts": parsed.get("thoughts", [])
+                "thoughts": parsed.get("thoughts", []),
+                "appearance": parsed.get("appearance", []),
+                "clothing": parsed.get("clothing", [])
             }
         except Exception as e:
             self.logger.error(f"Error in post-processing: {str(e)}")
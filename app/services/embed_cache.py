@@ -0,0 +1,156 @@
+"""
+Image Embedding Cache Service
+============================
+
+This module caches CLIP image embeddings by image ID so an image that
+has already been embedded is never run through the encoder again. It handles:
+1. An in-process LRU of recently used embeddings
+2. A SQLite table that keeps embeddings across restarts
+3. Bounding both stores to a fixed number of entries
+
+Re-rating an image whose earlier storage attempt failed then only costs
+the Qdrant upsert instead of a download plus CLIP inference.
+Disk reads and writes go through a single cache thread; memory hits
+are answered directly.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import logging
+import numpy as np
+from app.models.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of embeddings kept in memory and on disk
+MAX_ENTRIES = 1000
+
+class EmbedCache:
+    """
+    Two-level cache of image embeddings keyed by image ID.
+
+    Lookups hit the in-memory LRU first and fall back to the
+    image_embeddings table, promoting disk hits back into memory.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        """
+        Initialize the cache; the table is opened on first use.
+
+        Args:
+            max_entries: Maximum number of embeddings to keep
+        """
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        # One worker, since SQLite connections are bound to the thread that opened them
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-cache")
+        self._db = None  # Database owned by the cache thread
+
+    def _connection(self):
+        """Open the database and backing table on first use; runs on the cache thread."""
+        if self._db is None:
+            self._db = Database()
+            conn = self._db.get_connection()
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS image_embeddings (
+                image_id TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                thumbnail_b64 TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            conn.commit()
+        return self._db.get_connection()
+
+    async def get(self, image_id: str) -> Optional[Tuple[np.ndarray, Optional[str]]]:
+        """
+        Look up the embedding of an image.
+
+        Args:
+            image_id: Unique identifier of the image
+
+        Returns:
+            Tuple of (embedding vector, base64 thumbnail) or None if not cached
+        """
+        entry = self._memory.get(image_id)
+        if entry is not None:
+            self._memory.move_to_end(image_id)
+            return entry
+
+        loop = asyncio.get_event_loop()
+        entry = await loop.run_in_executor(self._executor, self._get, image_id)
+        if entry is not None:
+            self._remember(image_id, entry)
+        return entry
+
+    def put(self, image_id: str, vector, thumbnail_b64: Optional[str] = None) -> None:
+        """
+        Store the embedding of an image, scheduling the disk write without waiting for it.
+
+        Args:
+            image_id: Unique identifier of the image
+            vector: Embedding vector (numpy array or list of floats)
+            thumbnail_b64: Optional base64 encoded thumbnail
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        self._remember(image_id, (vector, thumbnail_b64))
+        self._executor.submit(self._put, image_id, vector, thumbnail_b64)
+
+    def _get(self, image_id: str) -> Optional[Tuple[np.ndarray, Optional[str]]]:
+        """Read an embedding from disk; runs on the cache thread."""
+        try:
+            row = self._connection().execute(
+                "SELECT vector, thumbnail_b64 FROM image_embeddings WHERE image_id = ?",
+                (image_id,)
+            ).fetchone()
+        except Exception as e:
+            logger.error(f"Error reading cached embedding: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+        return (np.frombuffer(row[0], dtype=np.float32), row[1])
+
+    def _put(self, image_id: str, vector: np.ndarray, thumbnail_b64: Optional[str]) -> None:
+        """Write an embedding and drop surplus entries; runs on the cache thread."""
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO image_embeddings (image_id, vector, thumbnail_b64) VALUES (?, ?, ?)",
+                (image_id, vector.tobytes(), thumbnail_b64)
+            )
+            # Keep only the most recent entries on disk
+            conn.execute(
+                "DELETE FROM image_embeddings WHERE image_id NOT IN "
+                "(SELECT image_id FROM image_embeddings ORDER BY timestamp DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error caching embedding: {str(e)}")
+            if self._db is not None:
+                self._db.get_connection().rollback()
+
+    def _remember(self, image_id: str, entry: Tuple[np.ndarray, Optional[str]]) -> None:
+        """Insert an entry into the in-memory LRU, evicting the oldest if full."""
+        self._memory[image_id] = entry
+        self._memory.move_to_end(image_id)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+# Global cache instance
+_embed_cache_instance = None
+
+def get_embed_cache() -> EmbedCache:
+    """
+    Get the global embedding cache instance.
+
+    Returns:
+        The global EmbedCache instance
+    """
+    global _embed_cache_instance
+    if _embed_cache_instance is None:
+        _embed_cache_instance = EmbedCache()
+    return _embed_cache_instance
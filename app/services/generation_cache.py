@@ -0,0 +1,148 @@
+"""
+Generation Cache Service
+=======================
+
+This module persists the results of the two slow steps of image creation
+so they survive server restarts. It handles:
+1. Parsed scenes keyed by image tag, character state and parser settings
+2. Generated image results keyed by scene prompt, orientation and generation settings
+3. Expiring entries after a fixed age and bounding the table size
+
+The in-process LRUs in the chat view stay the first lookup; this cache
+only answers their misses, which turns a repeated scene after a restart
+into a local SQLite read instead of an LLM call or a diffusion run.
+Hashing, JSON encoding and all SQLite work run on a dedicated thread so
+the UI event loop never waits on them.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+import asyncio
+import hashlib
+import json
+import logging
+from app.models.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of entries kept per kind
+MAX_ENTRIES = 2000
+
+# Age after which an entry is ignored and eventually dropped
+MAX_AGE_DAYS = 7
+
+class GenerationCache:
+    """
+    SQLite cache of parsed scenes and generated images.
+
+    Both kinds share one table and are told apart by their kind column,
+    values are stored as JSON.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_age_days: int = MAX_AGE_DAYS):
+        """
+        Initialize the cache; the table is opened on first use.
+
+        Args:
+            max_entries: Maximum number of entries to keep per kind
+            max_age_days: Days an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.max_age = f"-{max_age_days} days"
+        # One worker, since SQLite connections are bound to the thread that opened them
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="generation-cache")
+        self._db = None  # Database owned by the cache thread
+
+    def _connection(self):
+        """Open the database and backing table on first use; runs on the cache thread."""
+        if self._db is None:
+            self._db = Database()
+            conn = self._db.get_connection()
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS generation_cache (
+                kind TEXT NOT NULL,
+                cache_key TEXT NOT NULL,
+                value_json TEXT NOT NULL,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (kind, cache_key)
+            )
+            ''')
+            conn.commit()
+        return self._db.get_connection()
+
+    @staticmethod
+    def _digest(key: tuple) -> str:
+        """Hash a key tuple into a fixed-length string."""
+        return hashlib.sha256(json.dumps(key, default=str).encode("utf-8")).hexdigest()
+
+    async def get(self, kind: str, key: tuple) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            kind: 'scenes' or 'image'
+            key: Tuple of the inputs that produced the value
+
+        Returns:
+            The cached value, or None if missing or expired
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, self._get, kind, key)
+
+    def put(self, kind: str, key: tuple, value: Any) -> None:
+        """
+        Schedule storing a value and return without waiting for the write.
+
+        Args:
+            kind: 'scenes' or 'image'
+            key: Tuple of the inputs that produced the value
+            value: JSON-serializable result
+        """
+        self._executor.submit(self._put, kind, key, value)
+
+    def _get(self, kind: str, key: tuple) -> Optional[Any]:
+        """Read a value; runs on the cache thread."""
+        try:
+            row = self._connection().execute(
+                "SELECT value_json FROM generation_cache "
+                "WHERE kind = ? AND cache_key = ? AND timestamp > datetime('now', ?)",
+                (kind, self._digest(key), self.max_age)
+            ).fetchone()
+        except Exception as e:
+            logger.error(f"Error reading generation cache: {str(e)}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _put(self, kind: str, key: tuple, value: Any) -> None:
+        """Write a value, dropping expired and surplus entries of the same kind; runs on the cache thread."""
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO generation_cache (kind, cache_key, value_json) VALUES (?, ?, ?)",
+                (kind, self._digest(key), json.dumps(value))
+            )
+            conn.execute(
+                "DELETE FROM generation_cache WHERE kind = ? AND (timestamp <= datetime('now', ?) OR cache_key NOT IN "
+                "(SELECT cache_key FROM generation_cache WHERE kind = ? ORDER BY timestamp DESC LIMIT ?))",
+                (kind, self.max_age, kind, self.max_entries)
+            )
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error writing generation cache: {str(e)}")
+            if self._db is not None:
+                self._db.get_connection().rollback()
+
+# Global cache instance
+_generation_cache_instance = None
+
+def get_generation_cache() -> GenerationCache:
+    """
+    Get the global generation cache instance.
+
+    Returns:
+        The global GenerationCache instance
+    """
+    global _generation_cache_instance
+    if _generation_cache_instance is None:
+        _generation_cache_instance = GenerationCache()
+    return _generation_cache_instance
@@ -0,0 +1,60 @@
+"""
+Shared HTTP Client Service
+=========================
+
+This module provides a single pooled httpx.AsyncClient for outbound HTTP
+requests such as image downloads. It handles:
+1. Lazy creation of one process-wide client
+2. Connection pooling with capped keep-alive connections
+3. HTTP/2 multiplexing for concurrent requests to the same host
+4. Clean shutdown of the pool
+
+Reusing one client avoids a new TCP/TLS handshake for every request.
+"""
+
+import httpx
+
+# Global client instance
+_http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the global HTTP client instance.
+
+    The client is created on first use so it binds to the running event loop.
+
+    Returns:
+        The shared httpx.AsyncClient instance
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            timeout=30.0
+        )
+    return _http_client
+
+async def fetch_bytes(url: str) -> bytes:
+    """
+    Download a URL into memory using the shared client.
+
+    Args:
+        url: URL to download
+
+    Returns:
+        The response body
+
+    Raises:
+        httpx.HTTPStatusError: If the server returns an error status
+    """
+    response = await get_http_client().get(url)
+    response.raise_for_status()
+    return response.content
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its connection pool."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
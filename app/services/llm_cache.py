@@ -0,0 +1,113 @@
+"""
+LLM Response Cache Service
+=========================
+
+This module caches complete LLM responses so an identical request is
+answered without another round trip to the model. It handles:
+1. Building a cache key from the model, the normalized user message
+   and every piece of context that goes into the prompt
+2. An in-process LRU of recent responses with a time-to-live
+3. Hit and miss counters for judging whether the cache pays off
+
+Because the key covers the conversation history and character state,
+a cached response is only reused when the model would see exactly the
+same input again, e.g. when retrying a message after a failed turn.
+"""
+
+from collections import OrderedDict
+from typing import Any, Optional
+import hashlib
+import json
+import time
+
+# Default bounds of the cache
+MAX_ENTRIES = 256
+TTL_SECONDS = 3600
+
+class LLMResponseCache:
+    """
+    LRU cache of LLM responses with per-entry expiry.
+
+    Entries are stored as (expiry time, response text) and evicted
+    either when they expire or when the cache is full.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL_SECONDS):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of responses to keep
+            ttl: Seconds a response stays valid after being stored
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def cache_key(model: str, user_message: str, context: Any) -> str:
+        """
+        Build the cache key of a request.
+
+        Args:
+            model: Name of the model that answers the request
+            user_message: The user's message
+            context: Everything else the prompt is built from
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        # Whitespace differences don't change what the user asked
+        normalized = " ".join(user_message.split())
+        material = json.dumps([model, normalized, context], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Key returned by cache_key
+
+        Returns:
+            The cached response text, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Store a response, evicting the least recently used one if full.
+
+        Args:
+            key: Key returned by cache_key
+            response: Complete response text
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, response)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+# Global cache instance
+_llm_cache_instance = None
+
+def get_llm_cache() -> LLMResponseCache:
+    """
+    Get the global LLM response cache.
+
+    Returns:
+        The global LLMResponseCache instance
+    """
+    global _llm_cache_instance
+    if _llm_cache_instance is None:
+        _llm_cache_instance = LLMResponseCache()
+    return _llm_cache_instance
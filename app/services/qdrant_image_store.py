@@ -3,7 +3,7 @@ Qdrant Image Store Service
 =========================
 
 This service manages image storage and retrieval in Qdrant, including:
-- Storing image embeddings and metadata
+- Storing image embeddings and metadata, batching writes that arrive close together
 - Searching images by similarity
 - Managing image collections
 
@@ -11,7 +11,7 @@ The service is implemented as a singleton to ensure consistent
 state across the application.
 """
 
-from qdrant_client import QdrantClient, models
+from qdrant_client import AsyncQdrantClient, models
 from app.utils.config import Config
 from app.core.state_manager import StateManager
 import numpy as np
@@ -39,8 +39,20 @@ class QdrantImageStore:
             config = Config()
             host = config.get("qdrant", "host", "localhost")
             port = config.get("qdrant", "port", 6333)
-            self._client = QdrantClient(host=host, port=port)
+            grpc_port = config.get("qdrant", "grpc_port", 6334)
+            prefer_grpc = config.get("qdrant", "prefer_grpc", True)
+            # Native async client; the gRPC channel is opened lazily on the loop that first uses it
+            self._client = AsyncQdrantClient(host=host, port=port, grpc_port=grpc_port, prefer_grpc=prefer_grpc, timeout=60)
             self.state_manager = StateManager()
+            
+            # Bounds requests in flight, a single Qdrant node gains little beyond a few
+            self._request_slots = asyncio.Semaphore(config.get("qdrant", "max_concurrency", 4))
+            
+            # Ratings arriving close together are written with one upsert
+            self._batch_window = config.get("qdrant", "batch_window", 0.5)
+            self._batch_size = config.get("qdrant", "batch_size", 16)
+            self._pending = []       # (point, future) pairs waiting for the next upsert
+            self._flush_task = None  # Timer that flushes the pending points
             logger.debug("QdrantImageStore client initialized")
             
     async def check_health(self) -> bool:
@@ -51,12 +63,12 @@ class QdrantImageStore:
             bool: True if service is healthy, False otherwise
         """
         try:
-            collections = self._client.get_collections()
+            collections = await self._client.get_collections()
             has_collection = any(c.name == self._collection_name for c in collections.collections)
             
             if not has_collection:
                 # Create collection if it doesn't exist
-                self._client.create_collection(
+                await self._client.create_collection(
                     collection_name=self._collection_name,
                     vectors_config=models.VectorParams(
                         size=512,  # CLIP embedding dimension
@@ -82,6 +94,9 @@ class QdrantImageStore:
             
         Returns:
             bool: True if storage successful, False otherwise
+            
+        The point is queued and written together with any other points
+        stored within the batch window, or as soon as the batch is full.
         """
         try:
             # Get current state context
@@ -103,21 +118,60 @@ class QdrantImageStore:
                 payload=payload
             )
             
-            # Store in Qdrant
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self._client.upsert(
-                    collection_name=self._collection_name,
-                    points=[point]
-                )
-            )
-            return True
+            # Queue for the next batched upsert
+            result = asyncio.get_event_loop().create_future()
+            self._pending.append((point, result))
+            
+            if len(self._pending) >= self._batch_size:
+                # Batch is full, write it now instead of waiting for the timer
+                if self._flush_task is not None:
+                    self._flush_task.cancel()
+                    self._flush_task = None
+                await asyncio.shield(self._upsert_batch(self._take_pending()))
+            elif self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_after(self._batch_window))
+            
+            return await result
             
         except Exception as e:
             logger.error(f"Error storing image {image_id}: {str(e)}")
             return False
 
+    def _take_pending(self) -> list:
+        """Take all queued points, leaving the queue empty."""
+        batch, self._pending = self._pending, []
+        return batch
+
+    async def _flush_after(self, delay: float) -> None:
+        """Write the queued points once the batch window has passed."""
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        await self._upsert_batch(self._take_pending())
+
+    async def _upsert_batch(self, batch: list) -> None:
+        """
+        Write queued points with a single upsert and report the outcome to each caller.
+        
+        Args:
+            batch: (point, future) pairs taken from the queue
+        """
+        if not batch:
+            return
+        try:
+            async with self._request_slots:
+                await self._client.upsert(
+                    collection_name=self._collection_name,
+                    points=[point for point, _ in batch]
+                )
+            success = True
+            logger.debug(f"Stored batch of {len(batch)} images")
+        except Exception as e:
+            logger.error(f"Error storing batch of {len(batch)} images: {str(e)}")
+            success = False
+        for _, result in batch:
+            if not result.done():
+                result.set_result(success)
+
     async def search_similar(self, query_vector: list, limit: int = 5, score_threshold: float = 0.7):
         """
         Search for similar images using vector similarity.
@@ -131,16 +185,13 @@ class QdrantImageStore:
             list: Similar images with scores and metadata
         """
         try:
-            loop = asyncio.get_event_loop()
-            results = await loop.run_in_executor(
-                None,
-                lambda: self._client.search(
+            async with self._request_slots:
+                results = await self._client.search(
                     collection_name=self._collection_name,
                     query_vector=query_vector,
                     limit=limit,
                     score_threshold=score_threshold
                 )
-            )
             return results
         except Exception as e:
             logger.error(f"Error in similarity search: {str(e)}")
@@ -164,15 +215,12 @@ class QdrantImageStore:
                 "timestamp_updated": time.strftime("%Y-%m-%dT%H:%M:%S")
             }
             
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self._client.set_payload(
+            async with self._request_slots:
+                await self._client.set_payload(
                     collection_name=self._collection_name,
                     payload=payload_update,
                     points=[image_id]
                 )
-            )
             
             logger.debug(f"Updated rating for image {image_id} to {rating}")
             return True
@@ -14,12 +14,14 @@ MinIO (for raw files) and Qdrant (for searchable embeddings).
 """
 
 import os
+import asyncio
 from minio import Minio
 from typing import Optional, Dict, Any
 import logging
 from app.utils.config import Config
 from app.services.qdrant_image_store import QdrantImageStore
 from app.services.embedder import get_embedder
+from app.services.embed_cache import get_embed_cache
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -150,10 +152,9 @@ class StoreImages:
         Coordinate image storage across MinIO and Qdrant.
         
         This method:
-        1. Generates image embedding
-        2. Stores raw file in MinIO
-        3. Stores embedding and metadata in Qdrant
-        4. Ensures consistency between storages
+        1. Generates image embedding and stores raw file in MinIO concurrently
+        2. Stores embedding and metadata in Qdrant
+        3. Ensures consistency between storages
         
         Args:
             image_path: Path to the image file
@@ -164,14 +165,28 @@ class StoreImages:
             bool: True if storage successful in both systems, False otherwise
         """
         try:
-            # Get CLIP embedding
-            image_vector = self.embedder.embed_image_from_file(image_path)
+            loop = asyncio.get_event_loop()
+            embed_cache = get_embed_cache()
+
+            async def embed():
+                # Reuse the embedding from an earlier attempt if we have one
+                cached = await embed_cache.get(image_id)
+                if cached is not None:
+                    return cached[0]
+                # Get CLIP embedding off the event loop, inference blocks for a while
+                vector = await loop.run_in_executor(None, self.embedder.embed_image_from_file, image_path)
+                if vector is not None:
+                    embed_cache.put(image_id, vector)
+                return vector
+
+            # Embedding and the MinIO upload only share the input file, so run them side by side
+            image_vector, minio_url = await asyncio.gather(
+                embed(),
+                loop.run_in_executor(None, self.upload_image, image_path, f"{image_id}.jpg")
+            )
             if image_vector is None:
                 logger.error("Failed to create image embedding")
                 return False
-
-            # Upload to MinIO primary storage
-            minio_url = self.upload_image(image_path, f"{image_id}.jpg")
             if not minio_url:
                 logger.error("Failed to upload image to MinIO")
                 return False
@@ -200,4 +215,22 @@ class StoreImages:
 
         except Exception as e:
             logger.error(f"Error storing image in Qdrant: {str(e)}")
-            return False 
\ No newline at end of file
+            return False 
+
+# Global image store instance
+_image_store_instance = None
+
+def get_image_store() -> StoreImages:
+    """
+    Get the global image storage coordinator.
+    
+    This function ensures a single MinIO client and bucket check is
+    shared across the application, initializing it on first use.
+    
+    Returns:
+        The global StoreImages instance
+    """
+    global _image_store_instance
+    if _image_store_instance is None:
+        _image_store_instance = StoreImages()
+    return _image_store_instance
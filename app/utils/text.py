@@ -0,0 +1,31 @@
+"""
+Text Utilities
+=============
+
+This module provides small text helpers shared by the UI components:
+1. Truncating descriptions for captions without splitting characters
+"""
+
+import unicodedata
+
+def shorten(text: str, limit: int = 30) -> str:
+    """
+    Truncate text to a caption length, adding an ellipsis when cut.
+
+    Args:
+        text: Text to truncate
+        limit: Maximum number of characters kept before the ellipsis
+
+    Returns:
+        str: The text itself if short enough, otherwise its first characters
+        followed by '...'
+
+    The cut is moved back past any combining marks so an accented letter
+    written as base character plus accent is never split in two.
+    """
+    if len(text) <= limit:
+        return text
+    cut = limit
+    while cut > 0 and unicodedata.combining(text[cut]):
+        cut -= 1
+    return f"{text[:cut]}..."